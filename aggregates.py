@@ -0,0 +1,229 @@
+import hashlib
+import heapq
+import json
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+
+from preprocessing import preprocess_text, preprocess_version
+
+# ========== Konfigurasi ==========
+
+AGGREGATE_STORE = 'data/aggregates.json'
+SENTIMENT_SOURCE = 'data/data_dengan_sentimen.csv'
+RAW_SOURCE = 'data/data_mentah.csv'
+RAW_COLUMNS = ['id_user', 'tweet', 'tanggal']
+TANGGAL_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+# Mapping label ke format baku
+LABEL_MAPPING = {
+    "positif": "Positif",
+    "negatif": "Negatif",
+    "netral": "Netral"
+}
+SENTIMENT_ORDER = ["Positif", "Negatif", "Netral"]
+
+
+def empty_aggregates():
+    return {
+        'sentiment_counts': {label: 0 for label in SENTIMENT_ORDER},
+        'term_freq': {},
+        'term_freq_by_sentiment': {label: {} for label in SENTIMENT_ORDER},
+        'daily_counts': {},
+        # Posisi byte terakhir yang sudah diagregasi per file sumber, beserta
+        # sidik file (mtime, ukuran, SHA-256 bagian yang sudah dibaca)
+        'offsets': {},
+        'fingerprints': {},
+        # Frekuensi kata bergantung pada preprocessing; agregat versi lain dihitung ulang
+        'preprocess_version': preprocess_version(),
+    }
+
+
+def normalize_label(label):
+    return LABEL_MAPPING.get(str(label).strip().lower())
+
+
+# ========== Update Inkremental ==========
+
+def _add_counts(target, counter):
+    for key, value in counter.items():
+        target[key] = target.get(key, 0) + value
+
+
+def update_sentiment_aggregates(agg, rows):
+    """Tambahkan baris baru (kolom `tweet`, `Sentiment`) ke agregat sentimen dan frekuensi kata."""
+    rows = rows.dropna(subset=['tweet', 'Sentiment'])
+    labels = rows['Sentiment'].map(normalize_label)
+
+    _add_counts(agg['sentiment_counts'], Counter(labels.dropna()))
+    _add_counts(agg['term_freq'], Counter(' '.join(rows['tweet'].astype(str)).split()))
+
+    for label in SENTIMENT_ORDER:
+        subset = rows.loc[labels == label, 'tweet']
+        if subset.empty:
+            continue
+        words = Counter(' '.join(subset.apply(preprocess_text)).split())
+        _add_counts(agg['term_freq_by_sentiment'].setdefault(label, {}), words)
+    return agg
+
+
+def update_daily_aggregates(agg, rows):
+    """Tambahkan baris data mentah (kolom `tanggal`) ke jumlah tweet per hari."""
+    days = Counter()
+    for value in rows['tanggal'].dropna():
+        try:
+            day = datetime.strptime(str(value).strip(), TANGGAL_FORMAT).date().isoformat()
+        except ValueError:
+            continue
+        days[day] += 1
+    _add_counts(agg['daily_counts'], days)
+    return agg
+
+
+def _read_appended(path, offset, fingerprint=None, **read_kwargs):
+    """
+    Baca hanya baris yang ditambahkan setelah `offset` (byte).
+
+    `fingerprint` dari refresh sebelumnya (mtime, ukuran, dan SHA-256 dari
+    `offset` byte pertama) dipakai untuk mengenali file yang ditulis ulang,
+    termasuk yang ukurannya sama atau bertambah. Mengembalikan
+    (DataFrame, offset_baru, fingerprint_baru, reset); `reset` bernilai True
+    jika isi yang sudah diagregasi berubah, sehingga agregat perlu dibangun ulang.
+    """
+    stat = os.stat(path)
+    if offset and fingerprint and (fingerprint['mtime_ns'], fingerprint['size']) == (stat.st_mtime_ns, stat.st_size):
+        return None, offset, fingerprint, False  # file tidak berubah sama sekali
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    if offset and (fingerprint is None or len(data) < offset
+                   or hashlib.sha256(data[:offset]).hexdigest() != fingerprint['sha256']):
+        return None, 0, None, True
+
+    if offset == 0:
+        offset = data.find(b'\n') + 1  # lewati header
+    # Abaikan baris terakhir yang belum lengkap; akan dibaca pada refresh berikutnya
+    new_bytes = data[offset:]
+    new_bytes = new_bytes[:new_bytes.rfind(b'\n') + 1]
+    new_offset = offset + len(new_bytes)
+    fingerprint = {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': hashlib.sha256(data[:new_offset]).hexdigest(),
+    }
+    if not new_bytes.strip():
+        return None, new_offset, fingerprint, False
+
+    frame = pd.read_csv(BytesIO(new_bytes), header=None, **read_kwargs)
+    return frame, new_offset, fingerprint, False
+
+
+def refresh_aggregates(store_path=AGGREGATE_STORE, sentiment_path=SENTIMENT_SOURCE,
+                       raw_path=RAW_SOURCE):
+    """
+    Muat agregat dari `store_path` lalu tambahkan hanya baris baru dari file sumber.
+
+    Jika tidak ada baris baru, tidak ada file sumber yang di-parse.
+    """
+    agg = load_aggregates(store_path)
+    offsets = agg['offsets']
+    fingerprints = agg.setdefault('fingerprints', {})
+    changed = False
+
+    if os.path.exists(sentiment_path):
+        frame, new_offset, fingerprint, reset = _read_appended(
+            sentiment_path, offsets.get(sentiment_path, 0), fingerprints.get(sentiment_path),
+            names=['tweet', 'Sentiment'], usecols=[0, 1]
+        )
+        if reset:
+            return rebuild_aggregates(store_path, sentiment_path, raw_path)
+        if frame is not None:
+            update_sentiment_aggregates(agg, frame)
+        changed |= fingerprint != fingerprints.get(sentiment_path)
+        offsets[sentiment_path] = new_offset
+        fingerprints[sentiment_path] = fingerprint
+
+    if os.path.exists(raw_path):
+        frame, new_offset, fingerprint, reset = _read_appended(
+            raw_path, offsets.get(raw_path, 0), fingerprints.get(raw_path),
+            names=RAW_COLUMNS, usecols=[0, 1, 2], sep=';', dtype=str,
+            on_bad_lines='skip'
+        )
+        if reset:
+            return rebuild_aggregates(store_path, sentiment_path, raw_path)
+        if frame is not None:
+            update_daily_aggregates(agg, frame)
+        changed |= fingerprint != fingerprints.get(raw_path)
+        offsets[raw_path] = new_offset
+        fingerprints[raw_path] = fingerprint
+
+    if changed:
+        save_aggregates(agg, store_path)
+    return agg
+
+
+def rebuild_aggregates(store_path=AGGREGATE_STORE, sentiment_path=SENTIMENT_SOURCE,
+                       raw_path=RAW_SOURCE):
+    if os.path.exists(store_path):
+        os.remove(store_path)
+    return refresh_aggregates(store_path, sentiment_path, raw_path)
+
+
+# ========== Penyimpanan ==========
+
+def load_aggregates(store_path=AGGREGATE_STORE):
+    """Agregat tersimpan; kosong (sehingga dihitung ulang dari awal) jika preprocessing-nya berbeda."""
+    if not os.path.exists(store_path):
+        return empty_aggregates()
+    with open(store_path, 'r', encoding='utf-8') as f:
+        agg = json.load(f)
+    if agg.get('preprocess_version') != preprocess_version():
+        return empty_aggregates()
+    return agg
+
+
+def save_aggregates(agg, store_path=AGGREGATE_STORE):
+    # Tulis ke file sementara (nama unik per penulisan) lalu ganti, agar pembaca
+    # tidak melihat file setengah jadi dan penulis bersamaan tidak saling menimpa
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(store_path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(agg, f, ensure_ascii=False)
+        os.replace(tmp_path, store_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+# ========== Query untuk Dashboard ==========
+
+def sentiment_counts_frame(agg):
+    counts = agg['sentiment_counts']
+    return pd.DataFrame({
+        'Sentimen': SENTIMENT_ORDER,
+        'Jumlah': [counts.get(label, 0) for label in SENTIMENT_ORDER]
+    })
+
+
+def top_terms(agg, n=20, sentiment=None):
+    freq = agg['term_freq'] if sentiment is None else agg['term_freq_by_sentiment'].get(sentiment, {})
+    top = heapq.nlargest(n, freq.items(), key=lambda item: item[1])
+    return pd.Series(dict(top), dtype='int64')
+
+
+def daily_counts_frame(agg):
+    daily = agg['daily_counts']
+    frame = pd.DataFrame({'Tanggal': list(daily.keys()), 'Jumlah': list(daily.values())})
+    frame['Tanggal'] = pd.to_datetime(frame['Tanggal'])
+    return frame.sort_values('Tanggal').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    agg = rebuild_aggregates()
+    print("Agregat dibangun ulang:")
+    print(sentiment_counts_frame(agg).to_string(index=False))
+    print(f"{len(agg['term_freq'])} kata unik, {len(agg['daily_counts'])} hari")
@@ -2,40 +2,29 @@ import streamlit as st
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import joblib
-import re
+import os
 from wordcloud import WordCloud
 import plotly.express as px
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 from datetime import datetime
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import confusion_matrix, accuracy_score, classification_report
 from streamlit_option_menu import option_menu
 import plotly.graph_objects as go
 
-# Download NLTK data (silently)
-import nltk
-
-import nltk
-
-nltk.download('stopwords')
-nltk.download('wordnet')
-nltk.download('omw-1.4')
+from aggregates import (
+    daily_counts_frame, refresh_aggregates, sentiment_counts_frame, top_terms
+)
+from cascade import escalation_rate, load_threshold, new_cascade_stats
+from preprocessing import download_nltk_data, preprocess_text
+from registry import ModelRegistry, load_test_data
+from scoring import (cleanup_old_outputs, count_rows, new_output_path, read_result_page,
+                     score_texts, score_upload)
+from streaming import WINDOW_STORE, load_windows
 
-from nltk.corpus import stopwords
+# Download NLTK data (silently)
+download_nltk_data()
 
 # ========== Utility Functions ==========
 
-def preprocess_text(text):
-    stop_words = set(stopwords.words('indonesian') + stopwords.words('english'))
-    lemmatizer = WordNetLemmatizer()
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text)
-    text = re.sub(r'[^a-z\s]', '', text.lower())
-    words = [lemmatizer.lemmatize(word) for word in text.split() if word not in stop_words]
-    return ' '.join(words)
-
 def plot_confusion_matrix(y_true, y_pred, title="Confusion Matrix"):
     labels = sorted(list(set(list(y_true) + list(y_pred))))
     cm = confusion_matrix(y_true, y_pred, labels=labels)
@@ -47,8 +36,8 @@ def plot_confusion_matrix(y_true, y_pred, title="Confusion Matrix"):
     ax.set_title(title)
     return fig
 
-def generate_wordcloud(text, title=None):
-    if not text.strip():
+def generate_wordcloud(frequencies, title=None):
+    if not frequencies:
         st.write("No data available to generate WordCloud.")
         return
     wc = WordCloud(
@@ -58,9 +47,8 @@ def generate_wordcloud(text, title=None):
         height=300,
         contour_width=1,
         contour_color='steelblue',
-        collocations=False,
-        stopwords=set(stopwords.words('indonesian') + stopwords.words('english'))
-    ).generate(text)
+        collocations=False
+    ).generate_from_frequencies(frequencies)
     plt.figure(figsize=(6, 4))
     plt.imshow(wc, interpolation='bilinear')
     plt.axis('off')
@@ -71,21 +59,38 @@ def generate_wordcloud(text, title=None):
 # ========== Cache Loaders ==========
 
 @st.cache_data(show_spinner=True)
-def load_data():
-    return pd.read_csv('data/data_dengan_sentimen.csv')
+def load_test_split(version):
+    # Split uji yang disimpan bersama versi model (sudah di-preprocess dan di-encode)
+    return load_test_data(version)
+
+@st.cache_data(ttl=60, show_spinner=True)
+def load_aggregates():
+    # Hanya baris yang baru ditambahkan ke file sumber yang diproses
+    return refresh_aggregates()
+
+@st.cache_data(ttl=10, show_spinner=False)
+def load_stream_windows(last=60):
+    return load_windows(WINDOW_STORE, last=last)
 
 @st.cache_resource(show_spinner=True)
-def load_models():
-    models = {}
+def get_model_registry():
+    # Dimuat sekali per proses; versi baru dimuat di background oleh thread registry
+    registry = ModelRegistry()
     try:
-        models['nb'] = joblib.load('model/nb_pipeline.pkl')
-        models['svm'] = joblib.load('model/svm_pipeline.pkl')
-        models['xgb'] = joblib.load('model/xgb_pipeline.pkl')
-        models['tfidf'] = joblib.load('model/tfidf_vectorizer.pkl')
-        models['label_encoder'] = joblib.load('model/label_encoder.pkl')
+        registry.load_initial()
     except Exception as e:
         st.error(f"Error loading models: {e}")
-    return models
+    return registry.start()
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def cleanup_result_files():
+    # File hasil dari sesi yang sudah ditutup tidak pernah dihapus oleh sesinya sendiri
+    return cleanup_old_outputs()
+
+def load_models():
+    registry = get_model_registry()
+    models, _, version = registry.snapshot()
+    return models, version, registry.last_error
 
 # ========== PAGE CONFIG ==========
 
@@ -210,13 +215,19 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
+TABS = ["Analisis Sentimen", "Perbandingan Algoritma", "Prediksi Sentimen"]
+
+# Tab awal bisa dipilih lewat URL (?tab=Prediksi Sentimen), dipakai juga oleh loadtest.py
+requested_tab = st.query_params.get("tab")
+default_tab_index = TABS.index(requested_tab) if requested_tab in TABS else 0
+
 with st.sidebar:
         selected_tab = option_menu(
         "Menu", 
-      ["Analisis Sentimen", "Perbandingan Algoritma", "Prediksi Sentimen"],
+      TABS,
         icons=["bar-chart", "activity", "search"],
         menu_icon="cast",
-        default_index=0,
+        default_index=default_tab_index,
         styles={
             "container": {"background-color": "#1f2a40"},
             "icon": {"color": "white", "font-size": "18px"},
@@ -242,8 +253,8 @@ with st.sidebar:
     )
 # ========== Load Data & Models ==========
 
-data = load_data()
-models = load_models()
+models, model_version, reload_error = load_models()
+cleanup_result_files()
 
 nb_model = models.get('nb')
 svm_model = models.get('svm')
@@ -251,13 +262,11 @@ xgb_model = models.get('xgb')
 tfidf_vectorizer = models.get('tfidf')
 le = models.get('label_encoder')
 
-# ========== Split Data ==========
-
-train_data, test_data = train_test_split(
-    data, test_size=0.2, random_state=42, stratify=data['Sentiment']
-)
-X_test_raw = test_data['tweet']
-y_test = test_data['Sentiment']
+with st.sidebar:
+    st.caption(f"Versi model: {model_version or 'model/ (tanpa registry)'}")
+    if reload_error:
+        # Hot reload gagal: versi lama tetap dipakai sampai versi baru yang valid diaktifkan
+        st.warning(f"Gagal memuat versi model baru ({reload_error}); tetap memakai versi di atas.")
 
 # ========== PAGE LOGIC ==========
 
@@ -305,34 +314,8 @@ if selected_tab == "Analisis Sentimen":
         </div>
         """, unsafe_allow_html=True)
 
-    sentiment_counts = data['Sentiment'].value_counts().reset_index()
-    sentiment_counts.columns = ['Sentimen', 'Jumlah']  # <- ubah nama kolom di sini
-
-    # Mapping label ke format baku
-    label_mapping = {
-    "positif": "Positif",
-    "negatif": "Negatif",
-    "netral": "Netral"
-    }
-
-    # Bersihkan label → lowercase, strip spasi
-    sentiment_counts["Sentimen"] = sentiment_counts["Sentimen"].astype(str).str.strip().str.lower()
-
-    # Map label ke format standar
-    sentiment_counts["Sentimen"] = sentiment_counts["Sentimen"].map(label_mapping)
-
-    # Hapus baris kosong (jika ada label tidak dikenali)
-    sentiment_counts = sentiment_counts.dropna(subset=["Sentimen"])
-
-    # Urutkan label sesuai mapping warna
-    sentiment_order = ["Positif", "Negatif", "Netral"]
-    sentiment_counts = (
-        sentiment_counts
-        .set_index("Sentimen")
-        .reindex(sentiment_order)
-        .fillna(0)
-        .reset_index()
-    )
+    aggregates = load_aggregates()
+    sentiment_counts = sentiment_counts_frame(aggregates)
 
     color_map = {
         "Positif": "#2ecc71",   
@@ -395,7 +378,7 @@ if selected_tab == "Analisis Sentimen":
         )
         st.plotly_chart(fig_pie, use_container_width=True)
 
-    freq = pd.Series(' '.join(data['tweet']).split()).value_counts().head(20)
+    freq = top_terms(aggregates, n=20)
     fig_freq = px.bar(
         freq,
         x=freq.index,
@@ -423,31 +406,68 @@ if selected_tab == "Analisis Sentimen":
     fig_freq.update_traces(textfont_color='#000000')
     st.plotly_chart(fig_freq, use_container_width=True)
 
+    daily_counts = daily_counts_frame(aggregates)
+    if not daily_counts.empty:
+        fig_daily = px.line(
+            daily_counts,
+            x='Tanggal',
+            y='Jumlah',
+            markers=True,
+            title="Jumlah Tweet per Hari (Data Mentah)"
+        )
+        fig_daily.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color="#000000", size=14),
+            title_font=dict(size=18, color="#000000")
+        )
+        st.plotly_chart(fig_daily, use_container_width=True)
+
+    stream_windows = load_stream_windows()
+    if not stream_windows.empty:
+        st.markdown("### Sentimen Real-time (Streaming)")
+        fig_stream = px.bar(
+            stream_windows,
+            x='waktu',
+            y='Jumlah',
+            color='Sentiment',
+            title="Distribusi Sentimen per Window",
+            color_discrete_map=color_map
+        )
+        fig_stream.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color="#000000", size=14),
+            xaxis=dict(title='Waktu (UTC)'),
+            yaxis=dict(title='Jumlah')
+        )
+        st.plotly_chart(fig_stream, use_container_width=True)
+
     st.markdown("### WordCloud per Sentimen")
     sentiments = ['Positif', 'Negatif', 'Netral']
     cols_wc = st.columns(len(sentiments))
     for i, sent in enumerate(sentiments):
-        subset_text = ' '.join(data[data['Sentiment'] == sent]['tweet'].apply(preprocess_text))
         with cols_wc[i]:
             st.markdown(f"#### {sent}")
-            generate_wordcloud(subset_text)
+            generate_wordcloud(aggregates['term_freq_by_sentiment'].get(sent, {}))
 
 elif selected_tab == "Perbandingan Algoritma": 
     st.header("Perbandingan Algoritma")
 
+    # ========== Data Uji ==========
+
+    # Evaluasi memakai data uji versi model aktif, bukan split ulang dari CSV:
+    # data latih sudah dibersihkan dari near-duplicate sebelum di-split
+    X_test_prep, y_test_encoded = load_test_split(model_version)
+    X_test_prep = list(X_test_prep)
+    y_true_str = le.inverse_transform(y_test_encoded)
+
     models_dict = {
         "Naive Bayes": nb_model,
         "Support Vector Machine": svm_model,
         "XGBoost": xgb_model
     }
 
-    known_labels = set(le.classes_)
-    mask = y_test.isin(known_labels)
-    X_test_raw_filtered = X_test_raw[mask]
-    y_test_filtered = y_test[mask]
-
-    X_test_prep = X_test_raw_filtered.apply(preprocess_text)
-
     metrics_summary = {
         "Model": [],
         "Accuracy": [],
@@ -470,8 +490,6 @@ elif selected_tab == "Perbandingan Algoritma":
 
             y_pred = model.predict(X_test_prep)
             y_pred_encoded = le.transform(y_pred) if isinstance(y_pred[0], str) else y_pred
-            y_test_encoded = le.transform(y_test_filtered)
-            y_true_str = le.inverse_transform(y_test_encoded)
             y_pred_str = le.inverse_transform(y_pred_encoded)
 
             acc = accuracy_score(y_true_str, y_pred_str)
@@ -620,11 +638,39 @@ elif selected_tab == "Prediksi Sentimen":
     if not all([nb_model, svm_model, xgb_model]):
         st.error("Beberapa model belum dimuat. Pastikan semua model tersedia.")
     else:
+        prediction_modes = {
+            "Semua model": 'all',
+            "Cascade (NB → SVM/XGBoost)": 'cascade'
+        }
+        if models.get('student') is not None:
+            prediction_modes["Model ringkas (distilasi)"] = 'student'
+        mode_label = st.radio("Mode prediksi:", list(prediction_modes), horizontal=True)
+        mode = prediction_modes[mode_label]
+        threshold, threshold_stale = load_threshold(model_version)
+        if mode == 'cascade':
+            if threshold_stale:
+                st.warning(
+                    f"Kalibrasi cascade dibuat untuk versi model lain (aktif: {model_version}); "
+                    f"memakai threshold bawaan {threshold}. Jalankan `python cascade.py` untuk kalibrasi ulang."
+                )
+            threshold = st.slider(
+                "Threshold margin Naive Bayes", 0.0, 1.0, float(threshold), 0.01,
+                help="Teks dengan selisih probabilitas NB di bawah nilai ini diteruskan ke SVM dan XGBoost."
+            )
+
         new_text = st.text_input("Masukkan teks untuk prediksi sentimen:")
 
         if st.button("Prediksi Sentimen"):
             if not new_text.strip():
                 st.warning("Silakan masukkan beberapa teks.")
+            elif mode in ('cascade', 'student'):
+                try:
+                    result = score_texts(models, le, [new_text], mode, threshold).iloc[0]
+                    source = f"Cascade ({result['Tahap']})" if mode == 'cascade' else "Model Ringkas"
+                    st.markdown("### 🔍 Hasil Prediksi:")
+                    st.success(f"**{source}** → {result['Prediksi']}")
+                except Exception as e:
+                    st.error(f"Prediction error: {e}")
             else:
                 preprocessed = preprocess_text(new_text)
                 try:
@@ -646,35 +692,69 @@ elif selected_tab == "Prediksi Sentimen":
                     st.error(f"Prediction error: {e}")
 
         st.markdown("### 📂 Prediksi Sentimen dari File")
-        uploaded_file = st.file_uploader("Unggah file teks:", type=["txt"])
+        uploaded_file = st.file_uploader("Unggah file teks atau CSV:", type=["txt", "csv"])
 
         if uploaded_file is not None:
-            lines = uploaded_file.read().decode('utf-8').split('\n')
-            clean_lines = [line for line in lines if line.strip()]
-            preprocessed_lines = [preprocess_text(line) for line in clean_lines]
-
-            try:
-                predictions_nb = nb_model.predict(preprocessed_lines)
-                predictions_svm = svm_model.predict(preprocessed_lines)
-                predictions_xgb = xgb_model.predict(preprocessed_lines)
-
-                if le:
-                    predictions_nb = le.inverse_transform(predictions_nb)
-                    predictions_svm = le.inverse_transform(predictions_svm)
-                    predictions_xgb = le.inverse_transform(predictions_xgb)
-
-                results_df = pd.DataFrame({
-                    "Teks": clean_lines,
-                    "Naive Bayes": [p.capitalize() for p in predictions_nb],
-                    "SVM": [p.capitalize() for p in predictions_svm],
-                    "XGBoost": [p.capitalize() for p in predictions_xgb]
-                })
+            upload_key = f"{uploaded_file.name}-{uploaded_file.size}-{mode}-{threshold}"
+            bulk = st.session_state.get("bulk_result")
+            if bulk is not None and not os.path.exists(bulk["path"]):
+                # File hasil sudah kedaluwarsa dan dibersihkan
+                st.session_state.pop("bulk_result")
+                bulk = None
+            if bulk is not None and bulk["key"] != upload_key:
+                # File baru diunggah: hapus hasil file sebelumnya
+                if os.path.exists(bulk["path"]):
+                    os.remove(bulk["path"])
+                st.session_state.pop("bulk_result")
+                bulk = None
+
+            if bulk is None and st.button("Mulai Prediksi File"):
+                total_rows = count_rows(uploaded_file)
+                output_path = new_output_path()
+                progress = st.progress(0.0)
+                status = st.empty()
+                try:
+                    n_rows = 0
+                    cascade_stats = new_cascade_stats()
+                    for n_rows, rows_per_sec in score_upload(uploaded_file, models, le, output_path,
+                                                             mode=mode, threshold=threshold,
+                                                             stats=cascade_stats):
+                        progress.progress(min(n_rows / total_rows, 1.0))
+                        status.markdown(f"**{n_rows}** / ~{total_rows} baris • {rows_per_sec:.0f} baris/detik")
+                    progress.progress(1.0)
+                    bulk = {"key": upload_key, "path": output_path, "rows": n_rows,
+                            "mode": mode, "stats": cascade_stats}
+                    st.session_state["bulk_result"] = bulk
+                except Exception as e:
+                    # Jangan tinggalkan hasil setengah jadi di direktori sementara
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+                    st.error(f"Prediction error: {e}")
 
+            if bulk is not None and bulk["rows"] > 0:
                 st.markdown("### 🧾 Hasil Prediksi Teks dari File:")
-                st.dataframe(results_df)
-
-            except Exception as e:
-                st.error(f"Prediction error: {e}")
+                if bulk["mode"] == 'cascade':
+                    stats = bulk["stats"]
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Selesai di NB", stats["stage1"])
+                    col2.metric("Diteruskan ke SVM+XGBoost", stats["stage2"],
+                                f"{escalation_rate(stats):.1%}", delta_color="off")
+                    col3.metric("Waktu NB / SVM+XGBoost",
+                                f"{stats['stage1_seconds']:.1f}s / {stats['stage2_seconds']:.1f}s")
+                page_size = 100
+                n_pages = (bulk["rows"] - 1) // page_size + 1
+                page = st.number_input(
+                    f"Halaman (1-{n_pages})", min_value=1, max_value=n_pages, value=1, step=1
+                )
+                st.dataframe(read_result_page(bulk["path"], page - 1, page_size))
+
+                with open(bulk["path"], "rb") as f:
+                    st.download_button(
+                        "⬇️ Unduh Hasil (CSV)",
+                        data=f,
+                        file_name=f"prediksi_{os.path.splitext(uploaded_file.name)[0]}.csv",
+                        mime="text/csv"
+                    )
 
 # ========== FOOTER ==========
 
@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+
+from registry import load_active_models, load_test_data
+
+# ========== Konfigurasi ==========
+
+CASCADE_CONFIG = 'model/cascade.json'
+DEFAULT_THRESHOLD = 0.2
+STAGE_NB = "NB"
+STAGE_ENSEMBLE = "SVM+XGBoost"
+
+
+def load_threshold(model_version=None, path=CASCADE_CONFIG):
+    """
+    Threshold hasil kalibrasi untuk `model_version`; mengembalikan (threshold, basi).
+
+    Jika kalibrasi dibuat untuk versi model lain, threshold bawaan dipakai dan
+    `basi` bernilai True agar pemanggil dapat memberi peringatan.
+    """
+    if not os.path.exists(path):
+        return DEFAULT_THRESHOLD, False
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if config.get('model_version') != model_version:
+        return DEFAULT_THRESHOLD, True
+    return config.get('threshold', DEFAULT_THRESHOLD), False
+
+
+def probability_margin(proba):
+    """Selisih probabilitas kelas teratas dan kedua; kecil berarti model ragu."""
+    top2 = np.sort(proba, axis=1)[:, -2:]
+    return top2[:, 1] - top2[:, 0]
+
+
+def ensemble_proba(models, texts):
+    return (models['svm'].predict_proba(texts) + models['xgb'].predict_proba(texts)) / 2
+
+
+# ========== Statistik per Tahap ==========
+
+def new_cascade_stats():
+    return {
+        'total': 0,
+        'stage1': 0,
+        'stage2': 0,
+        'stage1_seconds': 0.0,
+        'stage2_seconds': 0.0,
+    }
+
+
+def escalation_rate(stats):
+    return stats['stage2'] / stats['total'] if stats['total'] else 0.0
+
+
+# ========== Prediksi Cascade ==========
+
+def cascade_predict(models, texts, threshold=DEFAULT_THRESHOLD, stats=None):
+    """
+    Prediksi teks yang sudah di-preprocess secara bertahap.
+
+    Naive Bayes menilai semua teks; hanya teks dengan margin probabilitas NB
+    di bawah `threshold` yang diteruskan ke rata-rata probabilitas SVM dan
+    XGBoost. Mengembalikan (label_terenkode, tahap) per teks.
+    """
+    texts = list(texts)
+    classes = models['nb'].classes_
+
+    start = time.perf_counter()
+    nb_proba = models['nb'].predict_proba(texts)
+    margin = probability_margin(nb_proba)
+    predictions = classes[nb_proba.argmax(axis=1)]
+    stage1_seconds = time.perf_counter() - start
+
+    uncertain = np.flatnonzero(margin < threshold)
+    stage2_seconds = 0.0
+    if len(uncertain):
+        start = time.perf_counter()
+        proba = ensemble_proba(models, [texts[i] for i in uncertain])
+        predictions[uncertain] = classes[proba.argmax(axis=1)]
+        stage2_seconds = time.perf_counter() - start
+
+    stages = np.full(len(texts), STAGE_NB, dtype=object)
+    stages[uncertain] = STAGE_ENSEMBLE
+
+    if stats is not None:
+        stats['total'] += len(texts)
+        stats['stage1'] += len(texts) - len(uncertain)
+        stats['stage2'] += len(uncertain)
+        stats['stage1_seconds'] += stage1_seconds
+        stats['stage2_seconds'] += stage2_seconds
+    return predictions, stages
+
+
+# ========== Kalibrasi Threshold ==========
+
+def calibrate_threshold(models, texts, y_true, max_accuracy_loss=0.01, grid=None):
+    """
+    Pilih threshold dengan eskalasi paling sedikit yang akurasinya turun paling
+    banyak `max_accuracy_loss` dibanding selalu memakai SVM+XGBoost.
+    """
+    texts = list(texts)
+    y_true = np.asarray(y_true)
+    classes = models['nb'].classes_
+    grid = np.linspace(0.0, 1.0, 101) if grid is None else np.asarray(grid)
+
+    start = time.perf_counter()
+    nb_proba = models['nb'].predict_proba(texts)
+    nb_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    ens_proba = ensemble_proba(models, texts)
+    ens_seconds = time.perf_counter() - start
+
+    margin = probability_margin(nb_proba)
+    nb_pred = classes[nb_proba.argmax(axis=1)]
+    ens_pred = classes[ens_proba.argmax(axis=1)]
+    reference_accuracy = float((ens_pred == y_true).mean())
+
+    candidates = []
+    for threshold in grid:
+        escalate = margin < threshold
+        accuracy = float((np.where(escalate, ens_pred, nb_pred) == y_true).mean())
+        rate = float(escalate.mean())
+        candidates.append({
+            'threshold': float(threshold),
+            'accuracy': accuracy,
+            'escalation_rate': rate,
+            # Perkiraan biaya relatif terhadap menjalankan SVM+XGBoost untuk semua data
+            'relative_cost': (nb_seconds + rate * ens_seconds) / ens_seconds,
+        })
+
+    feasible = [c for c in candidates if reference_accuracy - c['accuracy'] <= max_accuracy_loss]
+    if feasible:
+        best = min(feasible, key=lambda c: (c['escalation_rate'], -c['accuracy']))
+    else:
+        best = candidates[-1]
+    return {
+        **best,
+        'reference_accuracy': reference_accuracy,
+        'max_accuracy_loss': max_accuracy_loss,
+        'n_samples': len(texts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kalibrasi threshold cascade NB -> SVM/XGBoost.")
+    parser.add_argument('--max-accuracy-loss', type=float, default=0.01,
+                        help="Penurunan akurasi maksimum dibanding SVM+XGBoost penuh")
+    parser.add_argument('--test-data', default=None,
+                        help="File (X_test, y_test); bawaan: data uji milik versi model aktif")
+    parser.add_argument('--output', default=CASCADE_CONFIG)
+    args = parser.parse_args()
+
+    models, version = load_active_models()
+    if args.test_data:
+        X_test, y_test = joblib.load(args.test_data)
+    else:
+        X_test, y_test = load_test_data(version)
+    result = calibrate_threshold(models, X_test, y_test, args.max_accuracy_loss)
+    result['model_version'] = version
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    print(f"Threshold terpilih   : {result['threshold']:.2f}")
+    print(f"Akurasi cascade      : {result['accuracy']:.4f} (referensi {result['reference_accuracy']:.4f})")
+    print(f"Eskalasi ke SVM+XGB  : {result['escalation_rate']:.1%}")
+    print(f"Perkiraan biaya      : {result['relative_cost']:.2f}x dari SVM+XGBoost penuh")
+    print(f"Disimpan ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import time
+import uuid
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# ========== Konfigurasi ==========
+
+DATASET_ROOT = 'data/parquet'
+
+# Sumber CSV yang dikonversi: nama dataset -> argumen pembacaan CSV
+CSV_SOURCES = {
+    'data_dengan_sentimen': {
+        'path': 'data/data_dengan_sentimen.csv',
+        'read_kwargs': {},
+    },
+    'data_final': {
+        'path': 'data/data_final.csv',
+        'read_kwargs': {},
+    },
+    'data_mentah': {
+        'path': 'data/data_mentah.csv',
+        'read_kwargs': {
+            'sep': ';', 'usecols': [0, 1, 2], 'header': 0,
+            'names': ['id_user', 'tweet', 'tanggal'], 'dtype': str,
+            'on_bad_lines': 'skip',
+        },
+    },
+}
+
+INGEST_COLUMN = 'ingest_date'
+SOURCE_STAMP = '_source.json'  # awalan '_' diabaikan oleh pyarrow.dataset
+
+
+def dataset_path(name, root=DATASET_ROOT):
+    return os.path.join(root, name)
+
+
+def dataset_exists(name, root=DATASET_ROOT):
+    return os.path.isdir(dataset_path(name, root))
+
+
+def _source_stat(path):
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def dataset_is_fresh(name, root=DATASET_ROOT):
+    """True jika dataset dikonversi dari CSV sumber yang sama persis (mtime & ukuran)."""
+    if not dataset_exists(name, root):
+        return False
+    source_path = CSV_SOURCES[name]['path']
+    if not os.path.exists(source_path):
+        return True  # CSV sudah tidak ada, dataset kolumnar satu-satunya salinan
+    try:
+        with open(os.path.join(dataset_path(name, root), SOURCE_STAMP), 'r', encoding='utf-8') as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return stamp == _source_stat(source_path)
+
+
+def _partition_cols(frame):
+    return (['Sentiment'] if 'Sentiment' in frame.columns else []) + [INGEST_COLUMN]
+
+
+# ========== Konversi & Penulisan ==========
+
+def write_rows(name, frame, ingest_date=None, root=DATASET_ROOT):
+    """
+    Tambahkan baris ke dataset kolumnar, dipartisi per Sentiment dan tanggal ingest.
+
+    Setiap pemanggilan menulis file baru dengan nama unik, sehingga file lama
+    di partisi yang sama tidak tersentuh. Untuk menulis ulang seluruh dataset
+    dari CSV, gunakan `convert_csv` (menghapus direktori dataset lebih dulu).
+    """
+    frame = frame.copy()
+    frame[INGEST_COLUMN] = (ingest_date or date.today()).isoformat()
+    if 'Sentiment' in frame.columns:
+        frame = frame.dropna(subset=['Sentiment'])
+        frame['Sentiment'] = frame['Sentiment'].astype(str)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    pq.write_to_dataset(
+        table,
+        dataset_path(name, root),
+        partition_cols=_partition_cols(frame),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return len(frame)
+
+
+def convert_csv(name, ingest_date=None, root=DATASET_ROOT, overwrite=True):
+    source = CSV_SOURCES[name]
+    # Stat diambil sebelum CSV dibaca: jika CSV berubah selama konversi, stempel
+    # tidak cocok lagi dan dataset dianggap basi
+    stamp = _source_stat(source['path'])
+    frame = pd.read_csv(source['path'], **source['read_kwargs'])
+    if overwrite and dataset_exists(name, root):
+        shutil.rmtree(dataset_path(name, root))
+    n_rows = write_rows(name, frame, ingest_date, root)
+    with open(os.path.join(dataset_path(name, root), SOURCE_STAMP), 'w', encoding='utf-8') as f:
+        json.dump(stamp, f)
+    return n_rows
+
+
+def convert_all(ingest_date=None, root=DATASET_ROOT):
+    for name, source in CSV_SOURCES.items():
+        if not os.path.exists(source['path']):
+            continue
+        n_rows = convert_csv(name, ingest_date, root)
+        print(f"{source['path']} -> {dataset_path(name, root)} ({n_rows} baris)")
+
+
+# ========== Pembacaan dengan Projection & Predicate Pushdown ==========
+
+def load_dataset(name, columns=None, sentiments=None, since=None, until=None,
+                 root=DATASET_ROOT):
+    """
+    Muat dataset kolumnar.
+
+    Hanya kolom di `columns` yang dibaca, dan filter `sentiments` / `since` /
+    `until` (tanggal ingest) diterapkan pada partisi sehingga file yang tidak
+    cocok tidak dibuka sama sekali. `Sentiment` dikembalikan sebagai categorical.
+    """
+    dataset = ds.dataset(dataset_path(name, root), format='parquet', partitioning='hive')
+
+    conditions = []
+    if sentiments is not None:
+        conditions.append(ds.field('Sentiment').isin(list(sentiments)))
+    if since is not None:
+        conditions.append(ds.field(INGEST_COLUMN) >= str(since))
+    if until is not None:
+        conditions.append(ds.field(INGEST_COLUMN) <= str(until))
+    row_filter = None
+    for condition in conditions:
+        row_filter = condition if row_filter is None else row_filter & condition
+
+    table = dataset.to_table(columns=columns, filter=row_filter)
+    frame = table.to_pandas()
+    for column in ('Sentiment', INGEST_COLUMN):
+        if column in frame.columns:
+            frame[column] = frame[column].astype(str).astype('category')
+    return frame
+
+
+def read_table(name, columns=None, **filters):
+    """
+    Baca dari dataset kolumnar jika sudah dikonversi dari CSV versi terkini,
+    selain itu dari CSV aslinya (mis. CSV diperbarui setelah konversi).
+
+    Catatan: urutan baris Parquet mengikuti partisi, bukan urutan CSV.
+    """
+    if dataset_is_fresh(name):
+        return load_dataset(name, columns=columns, **filters)
+    if filters.get('since') is not None or filters.get('until') is not None:
+        raise ValueError(f"Filter since/until butuh dataset kolumnar '{name}' yang terkini; "
+                         f"CSV tidak memiliki kolom {INGEST_COLUMN}. Jalankan `python dataset.py convert`.")
+    source = CSV_SOURCES[name]
+    frame = pd.read_csv(source['path'], **source['read_kwargs'])
+    if 'Sentiment' in frame.columns:
+        frame['Sentiment'] = frame['Sentiment'].astype('category')
+    if filters.get('sentiments') is not None:
+        frame = frame[frame['Sentiment'].isin(filters['sentiments'])]
+    return frame[columns] if columns is not None else frame
+
+
+# ========== Benchmark ==========
+
+def _measure(load, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        frame = load()
+        timings.append(time.perf_counter() - start)
+    memory_mb = frame.memory_usage(deep=True).sum() / 1024 ** 2
+    return statistics.median(timings), memory_mb, len(frame)
+
+
+def benchmark(name='data_dengan_sentimen', repeats=5):
+    if not dataset_is_fresh(name):
+        convert_csv(name)
+    source = CSV_SOURCES[name]
+
+    cases = {
+        'CSV (pd.read_csv)': lambda: pd.read_csv(source['path'], **source['read_kwargs']),
+        'Parquet, semua kolom': lambda: load_dataset(name),
+    }
+    if name in ('data_dengan_sentimen', 'data_final'):
+        cases['Parquet, kolom Sentiment saja'] = lambda: load_dataset(name, columns=['Sentiment'])
+        cases['Parquet, partisi Negatif saja'] = lambda: load_dataset(
+            name, columns=['tweet', 'Sentiment'], sentiments=['Negatif'])
+    else:
+        cases['Parquet, kolom tweet saja'] = lambda: load_dataset(name, columns=['tweet'])
+
+    print(f"Benchmark '{name}' (median {repeats}x)")
+    print(f"{'Jalur':<34}{'Waktu (ms)':>12}{'Memori (MB)':>14}{'Baris':>10}")
+    for label, load in cases.items():
+        seconds, memory_mb, n_rows = _measure(load, repeats)
+        print(f"{label:<34}{seconds * 1000:>12.1f}{memory_mb:>14.2f}{n_rows:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Konversi dataset CSV ke format kolumnar (Parquet).")
+    sub = parser.add_subparsers(dest='command', required=True)
+    convert = sub.add_parser('convert', help="Konversi semua CSV di data/")
+    convert.add_argument('--ingest-date', type=date.fromisoformat, default=None)
+    bench = sub.add_parser('benchmark', help="Bandingkan waktu muat & memori CSV vs Parquet")
+    bench.add_argument('--name', choices=list(CSV_SOURCES), default='data_dengan_sentimen')
+    bench.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        convert_all(args.ingest_date)
+    else:
+        benchmark(args.name, args.repeats)
+
+
+if __name__ == '__main__':
+    main()
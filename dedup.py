@@ -0,0 +1,338 @@
+import argparse
+import csv
+import time
+import tracemalloc
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import preprocess_text
+
+# ========== Konfigurasi ==========
+
+NUM_PERM = 64
+BANDS = 16          # 16 band x 4 baris -> kandidat mulai di Jaccard ~0.5
+THRESHOLD = 0.7     # Jaccard (perkiraan) minimum untuk dianggap near-duplicate
+SHINGLE_SIZE = 2    # shingle = bigram kata hasil preprocess_text
+ONLINE_MAX_ITEMS = 100_000  # batas isi indeks online (streaming) sebelum dikosongkan
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_BAND_MULT = np.uint64(0x9E3779B97F4A7C15)
+
+
+# ========== MinHash ==========
+
+class MinHasher:
+    """Signature MinHash untuk teks yang sudah di-preprocess, divektorisasi dengan numpy."""
+
+    def __init__(self, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=42):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, text):
+        tokens = text.split()
+        n = self.shingle_size
+        if len(tokens) < n:
+            shingles = {' '.join(tokens)}
+        else:
+            shingles = {' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+        return [zlib.crc32(s.encode('utf-8')) for s in shingles]
+
+    def signatures(self, texts, batch_size=5000):
+        """Hitung signature (n, num_perm) uint32 untuk banyak teks sekaligus."""
+        texts = list(texts)
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        with np.errstate(over='ignore'):
+            for start in range(0, len(texts), batch_size):
+                hashes, lengths = [], []
+                for text in texts[start:start + batch_size]:
+                    h = self.shingle_hashes(text)
+                    hashes.extend(h)
+                    lengths.append(len(h))
+                hv = np.asarray(hashes, dtype=np.uint64)
+                phv = np.bitwise_and((np.outer(hv, self.a) + self.b) % _MERSENNE_PRIME, _MAX_HASH)
+                offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+                out[start:start + len(lengths)] = np.minimum.reduceat(phv, offsets, axis=0)
+        return out
+
+    def signature(self, text):
+        return self.signatures([text])[0]
+
+
+def band_keys(signatures, bands=BANDS):
+    """Gabungkan tiap band signature menjadi satu kunci uint64, bentuk (n, bands)."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    sig = signatures[:, :bands * rows].reshape(n, bands, rows).astype(np.uint64)
+    keys = np.zeros((n, bands), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for r in range(rows):
+            keys = keys * _BAND_MULT + sig[:, :, r]
+    return keys
+
+
+def estimated_jaccard(sig_a, sig_b):
+    return np.mean(sig_a == sig_b, axis=-1)
+
+
+# ========== Indeks LSH Inkremental (online) ==========
+
+class LSHIndex:
+    """
+    Indeks LSH untuk dedup online: `add_if_new` menolak teks yang mirip
+    dengan teks yang sudah pernah dimasukkan.
+
+    Signature disimpan dalam satu array numpy yang diperbesar bertahap, dan
+    setiap bucket band hanya menyimpan id (int) atau list id saat bertabrakan.
+
+    Dengan `max_items`, indeks dikosongkan setiap kali penuh sehingga memori
+    tetap terbatas pada stream tanpa akhir; duplikat hanya dikenali terhadap
+    teks sejak pengosongan terakhir.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD,
+                 shingle_size=SHINGLE_SIZE, seed=42, max_items=None):
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands = bands
+        self.threshold = threshold
+        self.max_items = max_items
+        self.resets = 0
+        self.buckets = [{} for _ in range(bands)]
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def reset(self):
+        """Kosongkan indeks; array signature dipakai ulang."""
+        self.buckets = [{} for _ in range(self.bands)]
+        self._size = 0
+        self.resets += 1
+
+    def _candidates(self, keys):
+        found = set()
+        for band, key in enumerate(keys.tolist()):
+            entry = self.buckets[band].get(key)
+            if entry is None:
+                continue
+            if isinstance(entry, list):
+                found.update(entry)
+            else:
+                found.add(entry)
+        return found
+
+    def _query_signature(self, sig, keys):
+        candidates = self._candidates(keys)
+        if not candidates:
+            return []
+        ids = np.fromiter(candidates, dtype=np.int64)
+        scores = estimated_jaccard(self._signatures[ids], sig)
+        return ids[scores >= self.threshold].tolist()
+
+    def _insert_signature(self, sig, keys):
+        if self.max_items is not None and self._size >= self.max_items:
+            self.reset()
+        if self._size == len(self._signatures):
+            grown = np.empty((len(self._signatures) * 2, self._signatures.shape[1]), dtype=np.uint32)
+            grown[:self._size] = self._signatures
+            self._signatures = grown
+        doc_id = self._size
+        self._signatures[doc_id] = sig
+        self._size += 1
+        for band, key in enumerate(keys.tolist()):
+            bucket = self.buckets[band]
+            entry = bucket.get(key)
+            if entry is None:
+                bucket[key] = doc_id
+            elif isinstance(entry, list):
+                entry.append(doc_id)
+            else:
+                bucket[key] = [entry, doc_id]
+        return doc_id
+
+    def insert(self, text):
+        sig = self.hasher.signature(text)
+        return self._insert_signature(sig, band_keys(sig[None, :], self.bands)[0])
+
+    def query(self, text):
+        sig = self.hasher.signature(text)
+        return self._query_signature(sig, band_keys(sig[None, :], self.bands)[0])
+
+    def add_if_new(self, text):
+        """Kembalikan (duplikat, id); teks baru dimasukkan ke indeks."""
+        sig = self.hasher.signature(text)
+        keys = band_keys(sig[None, :], self.bands)[0]
+        matches = self._query_signature(sig, keys)
+        if matches:
+            return True, matches[0]
+        return False, self._insert_signature(sig, keys)
+
+    def filter_new(self, texts):
+        """Versi batch dari `add_if_new`: mask boolean teks yang bukan duplikat."""
+        signatures = self.hasher.signatures(texts)
+        keys = band_keys(signatures, self.bands)
+        keep = np.zeros(len(signatures), dtype=bool)
+        for i in range(len(signatures)):
+            if not self._query_signature(signatures[i], keys[i]):
+                self._insert_signature(signatures[i], keys[i])
+                keep[i] = True
+        return keep
+
+
+# ========== Dedup Offline ==========
+
+def _find(parent, i):
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+    return root
+
+
+def cluster_duplicates(texts, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD,
+                       shingle_size=SHINGLE_SIZE, seed=42):
+    """
+    Kelompokkan near-duplicate pada seluruh dataset sekaligus.
+
+    Per band, baris diurutkan menurut kunci band (tanpa dict) dan setiap
+    anggota bucket dibandingkan dengan anggota pertamanya. Mengembalikan
+    array perwakilan: indeks teks paling awal di cluster masing-masing.
+    """
+    signatures = MinHasher(num_perm, shingle_size, seed).signatures(texts)
+    keys = band_keys(signatures, bands)
+    n = len(signatures)
+    parent = list(range(n))
+
+    for band in range(bands):
+        order = np.argsort(keys[:, band], kind='stable')
+        sorted_keys = keys[order, band]
+        new_group = np.empty(n, dtype=bool)
+        new_group[:1] = True
+        new_group[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        group_first = order[np.maximum.accumulate(np.where(new_group, np.arange(n), 0))]
+
+        members = order[~new_group]
+        firsts = group_first[~new_group]
+        similar = estimated_jaccard(signatures[members], signatures[firsts]) >= threshold
+        for i, j in zip(members[similar].tolist(), firsts[similar].tolist()):
+            ri, rj = _find(parent, i), _find(parent, j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+    return np.array([_find(parent, i) for i in range(n)])
+
+
+def near_duplicate_mask(texts, **kwargs):
+    """True untuk teks yang merupakan kemunculan pertama di cluster-nya."""
+    representatives = cluster_duplicates(texts, **kwargs)
+    return representatives == np.arange(len(representatives))
+
+
+def read_csv_first_columns(path, sep=','):
+    """
+    Baca CSV dengan nama kolom berulang (data_mentah.csv: id_user;tweet;tanggal;;;id_user;...):
+    hanya kemunculan pertama tiap nama kolom yang dimuat.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        header = next(csv.reader(f, delimiter=sep))
+    first = {}
+    for i, name in enumerate(header):
+        if name:
+            first.setdefault(name, i)
+    return pd.read_csv(path, sep=sep, header=0, usecols=list(first.values()), names=list(first),
+                       dtype=str, on_bad_lines='skip')
+
+
+def dedup_dataframe(df, column='tweet', preprocess=True, **kwargs):
+    texts = df[column].astype(str)
+    if preprocess:
+        texts = texts.apply(preprocess_text)
+    return df[near_duplicate_mask(texts.tolist(), **kwargs)]
+
+
+# ========== Benchmark ==========
+
+def synthetic_tweets(n, dup_rate=0.3, vocab_size=20000, seed=0):
+    """Tweet sintetis; sebagian adalah variasi (mention, kata tambahan, kata hilang) dari tweet lain."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    n_base = int(n * (1 - dup_rate))
+    lengths = rng.integers(8, 25, n_base)
+    base = [' '.join(vocab[rng.integers(0, vocab_size, k)]) for k in lengths]
+
+    tweets = list(base)
+    sources = rng.integers(0, n_base, n - n_base)
+    for src in sources:
+        words = base[src].split()
+        variant = rng.integers(0, 3)
+        if variant == 0:
+            words = [f"user{rng.integers(0, 1000)}"] + words
+        elif variant == 1:
+            words = words + list(vocab[rng.integers(0, vocab_size, 2)])
+        else:
+            del words[rng.integers(0, len(words))]
+        tweets.append(' '.join(words))
+    order = rng.permutation(n)
+    return [tweets[i] for i in order]
+
+
+def _timed(label, n, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<30}{seconds:>10.1f}s{n / seconds:>14,.0f}/s{peak / 1024 ** 2:>12.1f} MB")
+    return result
+
+
+def benchmark(n=1_000_000, online_n=100_000, dup_rate=0.3):
+    print(f"Membuat {n:,} tweet sintetis (dup_rate={dup_rate})...")
+    tweets = synthetic_tweets(n, dup_rate)
+
+    print(f"{'Tahap':<30}{'Waktu':>11}{'Throughput':>16}{'Memori puncak':>14}")
+    hasher = MinHasher()
+    _timed("Signature MinHash", n, lambda: hasher.signatures(tweets))
+    mask = _timed("Dedup offline (sort per band)", n, lambda: near_duplicate_mask(tweets))
+    print(f"  -> {n - mask.sum():,} near-duplicate dihapus dari {n:,}")
+
+    online = tweets[:online_n]
+    index = LSHIndex()
+    keep = _timed("Dedup online (LSHIndex)", online_n, lambda: index.filter_new(online))
+    print(f"  -> {online_n - keep.sum():,} near-duplicate ditolak dari {online_n:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deteksi near-duplicate tweet dengan MinHash LSH.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    clean = sub.add_parser('clean', help="Hapus near-duplicate dari file CSV")
+    clean.add_argument('input')
+    clean.add_argument('output')
+    clean.add_argument('--column', default='tweet')
+    clean.add_argument('--sep', default=',', help="Pemisah kolom, mis. ';' untuk data_mentah.csv")
+    clean.add_argument('--threshold', type=float, default=THRESHOLD)
+    bench = sub.add_parser('benchmark', help="Throughput & memori pada data sintetis")
+    bench.add_argument('--n', type=int, default=1_000_000)
+    bench.add_argument('--online-n', type=int, default=100_000)
+    bench.add_argument('--dup-rate', type=float, default=0.3)
+    args = parser.parse_args()
+
+    if args.command == 'clean':
+        df = read_csv_first_columns(args.input, args.sep).dropna(subset=[args.column])
+        cleaned = dedup_dataframe(df, args.column, threshold=args.threshold)
+        cleaned.to_csv(args.output, index=False, sep=args.sep)
+        print(f"{len(df) - len(cleaned)} near-duplicate dihapus, {len(cleaned)} baris disimpan ke {args.output}")
+    else:
+        benchmark(args.n, args.online_n, args.dup_rate)
+
+
+if __name__ == '__main__':
+    main()
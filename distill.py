@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+from sklearn.pipeline import Pipeline
+
+from dataset import read_table
+from preprocessing import download_nltk_data, preprocess_text
+from registry import (LEGACY_MODEL_DIR, LEGACY_TEST_DATA, LEGACY_TRAIN_TEXTS, MODEL_ARTIFACTS,
+                      artifact_paths, load_active_models, load_manifest, load_test_data,
+                      load_train_texts, register_version)
+
+# ========== Konfigurasi ==========
+
+STUDENT_PATH = 'model/student_pipeline.pkl'
+REPORT_PATH = 'model/distill_report.json'
+TEACHERS = ('svm', 'xgb')
+
+
+def load_unlabeled_texts(exclude=()):
+    """Tweet mentah (`data_mentah`) yang sudah di-preprocess, tanpa duplikat dan tanpa data uji."""
+    raw = read_table('data_mentah', columns=['tweet'])['tweet'].dropna()
+    exclude = set(exclude)
+    texts = {preprocess_text(tweet) for tweet in raw}
+    return sorted(t for t in texts if t and t not in exclude)
+
+
+def soft_labels(teachers, texts):
+    """Rata-rata probabilitas kelas dari SVC dan XGBoost sebagai target student."""
+    return np.mean([teachers[key].predict_proba(texts) for key in TEACHERS], axis=0)
+
+
+def fit_student(texts, soft, classes, max_features=5000, C=4.0):
+    """
+    Latih student linear (TF-IDF + LogisticRegression) pada soft label.
+
+    Setiap contoh diulang sekali per kelas dengan bobot sama dengan
+    probabilitas guru, sehingga log-loss berbobot setara dengan cross-entropy
+    terhadap distribusi guru.
+    """
+    vectorizer = TfidfVectorizer(max_features=max_features, ngram_range=(1, 2),
+                                 sublinear_tf=True, dtype=np.float32)
+    X = vectorizer.fit_transform(texts)
+
+    n_samples, n_classes = soft.shape
+    X_rep = sp.vstack([X] * n_classes, format='csr')
+    y_rep = np.repeat(classes, n_samples)
+    weights = soft.T.ravel()
+    keep = weights > 1e-3
+
+    clf = LogisticRegression(C=C, max_iter=1000)
+    clf.fit(X_rep[keep], y_rep[keep], sample_weight=weights[keep])
+    clf.coef_ = clf.coef_.astype(np.float32)
+    clf.intercept_ = clf.intercept_.astype(np.float32)
+    return Pipeline([('tfidf', vectorizer), ('clf', clf)])
+
+
+# ========== Laporan Akurasi / Latensi / Ukuran ==========
+
+def measure_latency(model, texts, n=1000, repeats=5):
+    """Median waktu prediksi dalam milidetik per 1000 teks."""
+    sample = list(texts)[:n]
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(sample)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) / len(sample) * 1000 * 1000
+
+
+def build_report(models, model_paths, X_test, y_test):
+    report = {}
+    for key, path in model_paths.items():
+        model = models[key]
+        report[key] = {
+            'accuracy': float(accuracy_score(y_test, model.predict(X_test))),
+            'latency_ms_per_1k': measure_latency(model, X_test),
+            'size_bytes': os.path.getsize(path),
+        }
+    student = report['student']
+    for key in TEACHERS:
+        student[f'agreement_{key}'] = float(
+            (models['student'].predict(X_test) == models[key].predict(X_test)).mean()
+        )
+        student[f'speedup_vs_{key}'] = report[key]['latency_ms_per_1k'] / student['latency_ms_per_1k']
+    return report
+
+
+def summarize_student(student, X_test, y_test):
+    """Metrik student dalam format yang sama dengan `metrics` di manifest registry."""
+    y_pred = student.predict(list(X_test))
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        y_test, y_pred, average='weighted', zero_division=0)
+    return {'accuracy': float(accuracy_score(y_test, y_pred)),
+            'precision': float(precision), 'recall': float(recall), 'f1': float(f1)}
+
+
+def distill_student(teachers, X_train, X_test, y_test,
+                    student_path=STUDENT_PATH, report_path=REPORT_PATH, teacher_paths=None):
+    """Tahap distilasi di workflow training: latih, simpan, dan laporkan student."""
+    texts = load_unlabeled_texts(exclude=X_test)
+    texts = sorted(set(texts) | set(t for t in X_train if t))
+    print(f"Distilasi: {len(texts)} teks tanpa label, guru {', '.join(TEACHERS)}")
+
+    soft = soft_labels(teachers, texts)
+    student = fit_student(texts, soft, teachers[TEACHERS[0]].classes_)
+    joblib.dump(student, student_path, compress=3)
+
+    models = dict(teachers, student=student)
+    paths = {key: (teacher_paths or {}).get(key, f'model/{key}_pipeline.pkl') for key in teachers}
+    paths['student'] = student_path
+    report = build_report(models, paths, list(X_test), np.asarray(y_test))
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'Model':<10}{'Akurasi':>10}{'ms/1k teks':>14}{'Ukuran (KB)':>14}")
+    for key, row in report.items():
+        print(f"{key:<10}{row['accuracy']:>10.4f}{row['latency_ms_per_1k']:>14.1f}"
+              f"{row['size_bytes'] / 1024:>14.1f}")
+    return student, report
+
+
+# ========== Distilasi Ulang dari Versi Aktif ==========
+
+def redistill_active(activate=True):
+    """
+    Latih ulang student dari model guru versi aktif dan daftarkan sebagai versi
+    baru: artefak, metrik, dan waktu versi aktif dibawa, student diganti.
+
+    Student dilatih pada data yang sama dengan tahap distilasi di
+    `train_models.py` (teks latih versi tersebut + tweet mentah), dan ditulis ke
+    direktori sementara sehingga `model/` tidak berubah.
+    """
+    models, version = load_active_models()
+    if version is None:
+        paths = {key: os.path.join(LEGACY_MODEL_DIR, filename)
+                 for key, filename in MODEL_ARTIFACTS.items()}
+        paths = {key: path for key, path in paths.items() if os.path.exists(path)}
+        paths['test_data'] = LEGACY_TEST_DATA
+        if os.path.exists(LEGACY_TRAIN_TEXTS):
+            paths['train_texts'] = LEGACY_TRAIN_TEXTS
+        manifest = {}
+    else:
+        paths = artifact_paths(version)
+        manifest = load_manifest(version)
+    paths.pop('student', None)
+    teachers = {key: models[key] for key in ('nb',) + TEACHERS}
+    X_test, y_test = load_test_data(version)
+    if 'train_texts' in paths:
+        X_train = load_train_texts(version)
+    else:
+        # Versi lama tanpa teks latih: student hanya memakai tweet mentah,
+        # dicatat di laporan agar tidak dianggap setara dengan student training
+        print(f"Peringatan: versi {version or 'model/'} tidak menyimpan teks latih; "
+              f"student hanya dilatih pada tweet mentah")
+        X_train = []
+
+    workdir = tempfile.mkdtemp(prefix='distill-')
+    try:
+        student_path = os.path.join(workdir, os.path.basename(STUDENT_PATH))
+        start = time.perf_counter()
+        student, report = distill_student(teachers, X_train, X_test, y_test,
+                                          student_path=student_path,
+                                          report_path=os.path.join(workdir, os.path.basename(REPORT_PATH)),
+                                          teacher_paths=paths)
+        fit_seconds = time.perf_counter() - start
+
+        metrics = dict(manifest.get('metrics', {}), student=summarize_student(student, X_test, y_test))
+        timing = dict(manifest.get('timing', {}), student={'fit_seconds': fit_seconds})
+        new_version = register_version(
+            dict(paths, student=student_path),
+            metrics=metrics,
+            timing=timing,
+            activate=activate,
+            extra={'distillation': report, 'distilled_from': version,
+                   'distilled_with_train_texts': bool(len(X_train))},
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"Student dari versi {version or 'model/'} terdaftar sebagai versi {new_version}"
+          + (" (aktif)" if activate else ""))
+    return new_version
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Distilasi ulang student dari model versi aktif.")
+    parser.add_argument('--no-activate', action='store_true', help="Daftarkan versi baru tanpa mengaktifkannya")
+    args = parser.parse_args()
+
+    download_nltk_data()
+    redistill_active(activate=not args.no_activate)
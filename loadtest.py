@@ -0,0 +1,204 @@
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# ========== Konfigurasi ==========
+
+APP_PATH = 'app.py'
+TABS = ["Analisis Sentimen", "Perbandingan Algoritma", "Prediksi Sentimen"]
+SAMPLE_PATH = 'data/prediksi.txt'
+ACTION_PREDICT_TEXT = "Prediksi teks"
+ACTION_PREDICT_FILE = "Prediksi file"
+
+_models = None
+_models_lock = threading.Lock()
+
+
+class UploadStub(io.BytesIO):
+    """Pengganti UploadedFile Streamlit (AppTest belum mendukung file_uploader)."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def sample_texts(path=SAMPLE_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        texts = [line.strip() for line in f if line.strip()]
+    return texts or ["Kesehatan mental dijaga"]
+
+
+def _active_models():
+    # Dimuat sekali per proses, seperti st.cache_resource di app.py. Ini salinan
+    # kedua di samping model milik app.py, sehingga RSS yang dilaporkan ikut
+    # memuat satu salinan model tambahan. Lock mencegah sesi --mode thread yang
+    # mulai bersamaan memuat salinan masing-masing.
+    global _models
+    with _models_lock:
+        if _models is None:
+            from registry import load_active_models
+            _models, _ = load_active_models()
+    return _models
+
+
+def _percentiles(values):
+    if len(values) == 1:
+        return {'p50': values[0], 'p90': values[0], 'p99': values[0], 'max': values[0]}
+    q = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': q[49], 'p90': q[89], 'p99': q[98], 'max': max(values)}
+
+
+def _peak_rss_mb():
+    # ru_maxrss dalam KB di Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ========== Satu Sesi Analis ==========
+
+def run_session(session_id, iterations=3, upload_rows=2000, timeout=300):
+    """
+    Simulasikan satu sesi: pindah ke setiap tab (rerun penuh app.py secara
+    headless), submit prediksi teks, lalu skor file unggahan sintetis.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    from scoring import new_output_path, score_upload
+
+    rng = random.Random(session_id)
+    texts = sample_texts()
+    timings, errors = [], []
+
+    def timed(action, func):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            errors.append(f"{action}: {e}")
+        timings.append((action, time.perf_counter() - start))
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    # CPU seluruh proses: thread_time tidak menghitung thread ScriptRunner
+    # milik AppTest, tempat app.py sebenarnya dijalankan
+    cpu_start = time.process_time()
+
+    for _ in range(iterations):
+        for tab in rng.sample(TABS, len(TABS)):
+            at.query_params['tab'] = tab
+            timed(tab, at.run)
+            if at.exception:
+                errors.append(f"{tab}: {at.exception[0].message}")
+
+            if tab == "Prediksi Sentimen" and at.text_input:
+                at.text_input[0].input(rng.choice(texts))
+                buttons = [b for b in at.button if b.label == "Prediksi Sentimen"]
+                if buttons:
+                    timed(ACTION_PREDICT_TEXT, buttons[0].click().run)
+
+        # Jalur unggah file memakai fungsi yang sama dengan app.py
+        lines = '\n'.join(rng.choice(texts) for _ in range(upload_rows)).encode('utf-8')
+        upload = UploadStub(lines, f'loadtest_{session_id}.txt')
+        models = _active_models()
+        output_path = new_output_path()
+        timed(ACTION_PREDICT_FILE, lambda: list(
+            score_upload(upload, models, models.get('label_encoder'), output_path)
+        ))
+        os.remove(output_path)
+
+    return {
+        'session': session_id,
+        'timings': timings,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'peak_rss_mb': _peak_rss_mb(),
+        'errors': errors,
+    }
+
+
+# ========== Laporan ==========
+
+def summarize(results, wall_seconds, process_cpu_seconds=None):
+    by_action = {}
+    for result in results:
+        for action, seconds in result['timings']:
+            by_action.setdefault(action, []).append(seconds * 1000)
+
+    return {
+        'sessions': len(results),
+        'wall_seconds': wall_seconds,
+        'reruns_per_second': sum(len(r['timings']) for r in results) / wall_seconds,
+        'process_cpu_seconds': process_cpu_seconds,
+        'latency_ms': {action: dict(_percentiles(values), n=len(values))
+                       for action, values in by_action.items()},
+        'per_session': [
+            {key: r[key] for key in ('session', 'cpu_seconds', 'peak_rss_mb')}
+            | {'errors': len(r['errors'])}
+            for r in results
+        ],
+        'errors': [e for r in results for e in r['errors']],
+    }
+
+
+def print_report(report, mode):
+    print(f"\n{report['sessions']} sesi bersamaan ({mode}), {report['wall_seconds']:.1f}s, "
+          f"{report['reruns_per_second']:.2f} aksi/detik")
+
+    print(f"\n{'Aksi':<26}{'n':>5}{'p50 (ms)':>11}{'p90 (ms)':>11}{'p99 (ms)':>11}{'max (ms)':>11}")
+    for action, row in report['latency_ms'].items():
+        print(f"{action:<26}{row['n']:>5}{row['p50']:>11.0f}{row['p90']:>11.0f}"
+              f"{row['p99']:>11.0f}{row['max']:>11.0f}")
+
+    cpu_label = 'CPU (s)' if mode == 'process' else 'CPU proses* (s)'
+    rss_label = 'RSS puncak** (MB)' if mode == 'process' else 'RSS proses** (MB)'
+    print(f"\n{'Sesi':<8}{cpu_label:>16}{rss_label:>20}{'Error':>8}")
+    for row in report['per_session']:
+        print(f"{row['session']:<8}{row['cpu_seconds']:>16.1f}{row['peak_rss_mb']:>20.1f}{row['errors']:>8}")
+    if mode == 'thread':
+        print(f"*  Mode thread: CPU seluruh proses selama sesi berjalan, termasuk sesi lain yang "
+              f"bersamaan; total CPU proses {report['process_cpu_seconds']:.1f}s untuk semua sesi.")
+    print("** Termasuk satu salinan model tambahan yang dimuat loadtest untuk jalur unggah file.")
+
+    for error in report['errors'][:10]:
+        print(f"! {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uji beban N sesi analis bersamaan pada dashboard.")
+    parser.add_argument('-n', '--sessions', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=3, help="Putaran per sesi (semua tab + unggah file)")
+    parser.add_argument('--upload-rows', type=int, default=2000)
+    parser.add_argument('--timeout', type=float, default=300, help="Batas waktu satu rerun (detik)")
+    parser.add_argument('--mode', choices=['process', 'thread'], default='process',
+                        help="process: satu proses per sesi (CPU/memori per sesi); "
+                             "thread: satu proses bersama seperti server Streamlit (CPU hanya total proses)")
+    parser.add_argument('--json', help="Simpan laporan lengkap ke file JSON")
+    args = parser.parse_args()
+
+    executor_cls = ProcessPoolExecutor if args.mode == 'process' else ThreadPoolExecutor
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    with executor_cls(max_workers=args.sessions) as executor:
+        futures = [
+            executor.submit(run_session, i, args.iterations, args.upload_rows, args.timeout)
+            for i in range(args.sessions)
+        ]
+        results = [f.result() for f in futures]
+    # Mode process: proses induk hanya menunggu, CPU sesi dihitung di tiap worker
+    process_cpu = (time.process_time() - cpu_start if args.mode == 'thread'
+                   else sum(r['cpu_seconds'] for r in results))
+    report = summarize(results, time.perf_counter() - start, process_cpu)
+
+    print_report(report, args.mode)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
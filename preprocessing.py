@@ -0,0 +1,43 @@
+import re
+
+import nltk
+from nltk.corpus import stopwords
+
+from stemming import get_stem_lookup
+
+# ========== Preprocessing bersama (app, trainer, streaming) ==========
+
+PREPROCESS_VERSION = 2  # naikkan jika clean_tokens / stemming berubah
+
+_stop_words = None
+
+
+def download_nltk_data():
+    nltk.download('stopwords', quiet=True)
+    nltk.download('wordnet', quiet=True)
+    nltk.download('omw-1.4', quiet=True)
+
+
+def get_stop_words():
+    global _stop_words
+    if _stop_words is None:
+        _stop_words = set(stopwords.words('indonesian') + stopwords.words('english'))
+    return _stop_words
+
+
+def clean_tokens(text):
+    stop_words = get_stop_words()
+    text = re.sub(r'http\S+|www\S+|https\S+', '', str(text))
+    text = re.sub(r'[^a-z\s]', '', text.lower())
+    return [word for word in text.split() if word not in stop_words]
+
+
+def preprocess_text(text):
+    # Stemming lewat tabel token -> kata dasar (Sastrawi + WordNet), lihat stemming.py
+    lookup = get_stem_lookup()
+    return ' '.join(lookup.stem(word) for word in clean_tokens(text))
+
+
+def preprocess_version():
+    """Identitas preprocessing (revisi + stemmer tabel) untuk hasil turunan yang disimpan, mis. agregat."""
+    return f"{PREPROCESS_VERSION}/{get_stem_lookup().stemmer or 'unknown'}"
@@ -0,0 +1,293 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import joblib
+
+# ========== Konfigurasi ==========
+
+REGISTRY_ROOT = 'model/registry'
+LEGACY_MODEL_DIR = 'model'
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+# Artefak yang dimuat aplikasi: kunci -> nama file
+MODEL_ARTIFACTS = {
+    'nb': 'nb_pipeline.pkl',
+    'svm': 'svm_pipeline.pkl',
+    'xgb': 'xgb_pipeline.pkl',
+    'tfidf': 'tfidf_vectorizer.pkl',
+    'label_encoder': 'label_encoder.pkl',
+    'student': 'student_pipeline.pkl',
+}
+# Artefak yang ikut diversikan tetapi tidak dimuat saat inferensi
+SKIP_LOAD = {'test_data', 'train_texts'}
+LEGACY_TEST_DATA = 'model/test_data.pkl'
+LEGACY_TRAIN_TEXTS = 'model/train_texts.pkl'
+
+
+def sha256sum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, text):
+    # Nama file sementara unik per penulisan agar penulis bersamaan tidak saling menimpa
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+# ========== Registry: Versi & Manifest ==========
+
+def list_versions(root=REGISTRY_ROOT):
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if name.startswith('v') and os.path.isfile(os.path.join(root, name, MANIFEST_FILE))
+    )
+
+
+def current_version(root=REGISTRY_ROOT):
+    path = os.path.join(root, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().strip() or None
+
+
+def set_current(version, root=REGISTRY_ROOT):
+    if version not in list_versions(root):
+        raise ValueError(f"Versi model tidak ditemukan: {version}")
+    _atomic_write(os.path.join(root, CURRENT_FILE), version)
+
+
+def load_manifest(version, root=REGISTRY_ROOT):
+    with open(os.path.join(root, version, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def register_version(artifacts, metrics=None, timing=None, root=REGISTRY_ROOT,
+                     activate=True, extra=None):
+    """
+    Salin artefak ke direktori versi baru beserta checksum, metrik, dan laporan waktu.
+
+    `artifacts` adalah dict kunci -> path file. Direktori versi disiapkan di
+    lokasi sementara lalu di-rename, sehingga pembaca tidak pernah melihat
+    versi yang belum lengkap.
+    """
+    os.makedirs(root, exist_ok=True)
+    existing = list_versions(root)
+    next_number = int(existing[-1][1:]) + 1 if existing else 1
+    version = f"v{next_number:04d}"
+
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=root)
+    try:
+        entries = {}
+        for key, src in artifacts.items():
+            filename = os.path.basename(src)
+            dst = os.path.join(staging, filename)
+            shutil.copy2(src, dst)
+            entries[key] = {
+                'file': filename,
+                'sha256': sha256sum(dst),
+                'size_bytes': os.path.getsize(dst),
+            }
+        manifest = {
+            'version': version,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'artifacts': entries,
+            'metrics': metrics or {},
+            'timing': timing or {},
+        }
+        if extra:
+            manifest.update(extra)
+        with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.rename(staging, os.path.join(root, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if activate:
+        set_current(version, root)
+    return version
+
+
+def verify_version(version, root=REGISTRY_ROOT):
+    """Pastikan checksum semua artefak cocok dengan manifest; lempar ValueError jika tidak."""
+    manifest = load_manifest(version, root)
+    for key, entry in manifest['artifacts'].items():
+        path = os.path.join(root, version, entry['file'])
+        if sha256sum(path) != entry['sha256']:
+            raise ValueError(f"Checksum tidak cocok untuk {key} pada versi {version}")
+    return manifest
+
+
+def load_version(version, root=REGISTRY_ROOT, verify=True):
+    manifest = verify_version(version, root) if verify else load_manifest(version, root)
+    models = {}
+    for key, entry in manifest['artifacts'].items():
+        if key in SKIP_LOAD:
+            continue
+        models[key] = joblib.load(os.path.join(root, version, entry['file']))
+    return models, manifest
+
+
+def load_legacy(model_dir=LEGACY_MODEL_DIR):
+    """Muat artefak dari path tetap di `model/` (sebelum registry dipakai)."""
+    models = {}
+    for key, filename in MODEL_ARTIFACTS.items():
+        path = os.path.join(model_dir, filename)
+        if os.path.exists(path):
+            models[key] = joblib.load(path)
+    return models
+
+
+def artifact_paths(version, root=REGISTRY_ROOT):
+    """Path file setiap artefak di direktori versi: kunci -> path."""
+    manifest = load_manifest(version, root)
+    return {key: os.path.join(root, version, entry['file'])
+            for key, entry in manifest['artifacts'].items()}
+
+
+def _load_split(key, legacy_path, version, root):
+    if version is None:
+        return joblib.load(legacy_path)
+    path = artifact_paths(version, root).get(key)
+    if path is None:
+        raise ValueError(f"Versi {version} tidak menyimpan artefak {key}")
+    return joblib.load(path)
+
+
+def load_test_data(version=None, root=REGISTRY_ROOT):
+    """
+    Muat (X_test, y_test) yang disimpan bersama versi model, sehingga evaluasi
+    dan kalibrasi memakai split yang sama dengan saat model dilatih.
+    Tanpa versi (sebelum registry dipakai), dibaca dari `model/test_data.pkl`.
+    """
+    return _load_split('test_data', LEGACY_TEST_DATA, version, root)
+
+
+def load_train_texts(version=None, root=REGISTRY_ROOT):
+    """Teks latih (sudah di-preprocess) versi model, dipakai ulang saat distilasi ulang."""
+    return _load_split('train_texts', LEGACY_TRAIN_TEXTS, version, root)
+
+
+def load_active_models(root=REGISTRY_ROOT):
+    """Muat model versi aktif (atau model lama di `model/`); mengembalikan (models, versi)."""
+    version = current_version(root)
+    if version is None:
+        return load_legacy(), None
+    models, _ = load_version(version, root)
+    return models, version
+
+
+# ========== Hot Reload ==========
+
+class ModelRegistry:
+    """
+    Penampung model aktif dengan hot reload di background.
+
+    Thread pemantau membaca file CURRENT; jika versinya berubah, versi baru
+    dimuat dan diverifikasi di thread tersebut, lalu referensi dict model
+    diganti sekaligus. Request yang sedang berjalan tetap memakai dict lama.
+    """
+
+    def __init__(self, root=REGISTRY_ROOT, poll_interval=5.0):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._models = {}
+        self._manifest = None
+        self._version = None
+        self._thread = None
+        self.last_error = None
+        self._failed_version = None
+
+    def snapshot(self):
+        with self._lock:
+            return self._models, self._manifest, self._version
+
+    def load_initial(self):
+        version = current_version(self.root)
+        if version is None:
+            self._models = load_legacy()
+            return
+        self._swap(version)
+
+    def _swap(self, version):
+        models, manifest = load_version(version, self.root)
+        with self._lock:
+            self._models, self._manifest, self._version = models, manifest, version
+
+    def check_for_update(self):
+        version = current_version(self.root)
+        if version is None or version in (self._version, self._failed_version):
+            return False
+        try:
+            self._swap(version)
+            self.last_error = None
+        except Exception as e:
+            # Versi rusak tidak menggantikan versi yang sedang berjalan
+            self.last_error = f"{version}: {e}"
+            self._failed_version = version
+            return False
+        return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self.check_for_update()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+            self._thread.start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kelola versi model di registry lokal.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="Tampilkan semua versi")
+    activate = sub.add_parser('activate', help="Aktifkan versi (rollback/rollforward)")
+    activate.add_argument('version')
+    verify = sub.add_parser('verify', help="Periksa checksum versi")
+    verify.add_argument('version')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        active = current_version()
+        for version in list_versions():
+            manifest = load_manifest(version)
+            marker = '*' if version == active else ' '
+            accuracy = {k: round(v.get('accuracy', 0), 4) for k, v in manifest['metrics'].items()}
+            print(f"{marker} {version}  {manifest['created_at']}  {accuracy}")
+    elif args.command == 'activate':
+        set_current(args.version)
+        print(f"Versi aktif: {args.version}")
+    else:
+        verify_version(args.version)
+        print(f"{args.version}: checksum OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+import csv
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from cascade import DEFAULT_THRESHOLD, cascade_predict
+from preprocessing import preprocess_text
+
+# ========== Konfigurasi ==========
+
+MODEL_COLUMNS = {
+    "Naive Bayes": 'nb',
+    "SVM": 'svm',
+    "XGBoost": 'xgb'
+}
+TEXT_COLUMN_CANDIDATES = ['tweet', 'text', 'teks', 'Teks', 'clean_tweet']
+DEFAULT_CHUNK_SIZE = 1000
+OUTPUT_PREFIX = 'prediksi_'
+OUTPUT_MAX_AGE_HOURS = 24  # file hasil yang lebih tua dihapus saat dashboard dimulai
+
+
+# ========== Membaca File Unggahan per Chunk ==========
+
+def count_rows(uploaded_file):
+    """Perkiraan jumlah baris (untuk progress bar) tanpa men-decode seluruh file."""
+    uploaded_file.seek(0)
+    total = 0
+    for block in iter(lambda: uploaded_file.read(1 << 20), b''):
+        total += block.count(b'\n')
+    uploaded_file.seek(0)
+    if uploaded_file.name.lower().endswith('.csv'):
+        total -= 1  # header
+    return max(total, 1)
+
+
+def _sniff_delimiter(uploaded_file):
+    sample = uploaded_file.read(4096).decode('utf-8', errors='replace')
+    uploaded_file.seek(0)
+    first_line = sample.splitlines()[0] if sample else ''
+    return ';' if first_line.count(';') > first_line.count(',') else ','
+
+
+def pick_text_column(columns, text_column=None):
+    if text_column is not None:
+        return text_column
+    for candidate in TEXT_COLUMN_CANDIDATES:
+        if candidate in columns:
+            return candidate
+    return columns[0]
+
+
+def iter_upload_chunks(uploaded_file, chunk_size=DEFAULT_CHUNK_SIZE, text_column=None):
+    """Hasilkan list teks per chunk dari file .txt (satu teks per baris) atau .csv."""
+    uploaded_file.seek(0)
+    if uploaded_file.name.lower().endswith('.csv'):
+        delimiter = _sniff_delimiter(uploaded_file)
+        reader = pd.read_csv(uploaded_file, sep=delimiter, dtype=str, chunksize=chunk_size,
+                             on_bad_lines='skip', encoding_errors='replace')
+        column = None
+        for frame in reader:
+            column = column or pick_text_column(list(frame.columns), text_column)
+            texts = frame[column].dropna()
+            texts = texts[texts.str.strip() != '']
+            if not texts.empty:
+                yield texts.tolist()
+        return
+
+    stream = io.TextIOWrapper(uploaded_file, encoding='utf-8', errors='replace')
+    try:
+        chunk = []
+        for line in stream:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        # Lepaskan wrapper tanpa menutup file unggahan milik Streamlit
+        stream.detach()
+
+
+# ========== Prediksi ==========
+
+def predict_labels(model, le, texts):
+    predictions = model.predict(texts)
+    if le is not None:
+        predictions = le.inverse_transform(predictions)
+    return [str(p).capitalize() for p in predictions]
+
+
+def result_columns(mode='all'):
+    if mode == 'cascade':
+        return ["Teks", "Prediksi", "Tahap"]
+    if mode == 'student':
+        return ["Teks", "Prediksi"]
+    return ["Teks"] + list(MODEL_COLUMNS)
+
+
+def score_texts(models, le, texts, mode='all', threshold=DEFAULT_THRESHOLD, stats=None):
+    """
+    Prediksi list teks mentah.
+
+    `mode='all'` menjalankan ketiga model; `mode='cascade'` menjalankan NB
+    lebih dulu dan hanya meneruskan teks yang meragukan ke SVM+XGBoost;
+    `mode='student'` memakai satu model ringkas hasil distilasi.
+    """
+    preprocessed = [preprocess_text(text) for text in texts]
+    if mode == 'student':
+        return pd.DataFrame({
+            "Teks": texts,
+            "Prediksi": predict_labels(models['student'], le, preprocessed),
+        })
+    if mode == 'cascade':
+        predictions, stages = cascade_predict(models, preprocessed, threshold, stats)
+        if le is not None:
+            predictions = le.inverse_transform(predictions)
+        return pd.DataFrame({
+            "Teks": texts,
+            "Prediksi": [str(p).capitalize() for p in predictions],
+            "Tahap": stages,
+        })
+
+    results = {"Teks": texts}
+    for column, key in MODEL_COLUMNS.items():
+        results[column] = predict_labels(models[key], le, preprocessed)
+    return pd.DataFrame(results)
+
+
+def score_upload(uploaded_file, models, le, output_path, chunk_size=DEFAULT_CHUNK_SIZE,
+                 text_column=None, mode='all', threshold=DEFAULT_THRESHOLD, stats=None):
+    """
+    Prediksi file unggahan per chunk dan tulis hasilnya ke CSV secara bertahap.
+
+    Menghasilkan (jumlah_baris_selesai, baris_per_detik) setelah setiap chunk
+    sehingga pemanggil dapat memperbarui progress bar.
+    """
+    started = time.perf_counter()
+    done = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(result_columns(mode))
+        for texts in iter_upload_chunks(uploaded_file, chunk_size, text_column):
+            chunk_df = score_texts(models, le, texts, mode, threshold, stats)
+            writer.writerows(chunk_df.itertuples(index=False, name=None))
+            f.flush()
+            done += len(chunk_df)
+            elapsed = time.perf_counter() - started
+            yield done, done / elapsed if elapsed > 0 else 0.0
+
+
+def new_output_path():
+    fd, path = tempfile.mkstemp(prefix=OUTPUT_PREFIX, suffix='.csv')
+    os.close(fd)
+    return path
+
+
+def cleanup_old_outputs(max_age_hours=OUTPUT_MAX_AGE_HOURS, directory=None):
+    """Hapus file hasil `prediksi_*.csv` yang tertinggal (mis. sesi ditutup) dan lebih tua dari batas umur."""
+    directory = directory or tempfile.gettempdir()
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for entry in os.scandir(directory):
+        if not (entry.name.startswith(OUTPUT_PREFIX) and entry.name.endswith('.csv')):
+            continue
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            continue  # sudah dihapus proses lain
+    return removed
+
+
+def read_result_page(output_path, page, page_size):
+    """Baca satu halaman hasil dari CSV tanpa memuat seluruh file."""
+    start = page * page_size
+    return pd.read_csv(output_path, skiprows=range(1, start + 1), nrows=page_size)
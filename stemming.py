@@ -0,0 +1,277 @@
+import argparse
+import atexit
+import gzip
+import os
+import queue
+import sys
+import tempfile
+import threading
+import warnings
+
+import pandas as pd
+from nltk.stem import WordNetLemmatizer
+
+try:
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+except ImportError:  # Sastrawi opsional; tanpa Sastrawi hanya WordNet yang dipakai
+    StemmerFactory = None
+
+# ========== Konfigurasi ==========
+
+LOOKUP_PATH = 'model/stem_lookup.tsv.gz'
+FLUSH_EVERY = 1000  # simpan token baru ke disk setiap N token
+HEADER_PREFIX = '#stemmer\t'
+# Stemmer yang tersedia di proses ini; dicatat di header tabel
+STEMMER_NAME = 'sastrawi+wordnet' if StemmerFactory is not None else 'wordnet'
+
+
+class StemLookup:
+    """
+    Tabel token -> kata dasar atas kosakata korpus.
+
+    Sastrawi (Indonesia) dicoba lebih dulu; jika token tidak berubah, dipakai
+    WordNet (Inggris). Hanya token yang akar katanya berbeda disimpan di dict,
+    token yang tidak berubah cukup disimpan di set.
+
+    Sastrawi lambat (~0,1-0,5 detik per token), jadi token yang belum pernah
+    dilihat tidak di-stem di jalur request: `stem` langsung mengembalikan hasil
+    WordNet, dan thread background men-stem token itu dengan Sastrawi lalu
+    menambahkannya ke tabel. `build` (training) tetap men-stem penuh secara
+    sinkron.
+
+    Header file mencatat stemmer pembuat tabel. Proses dengan stemmer lain
+    (mis. tanpa Sastrawi) tetap memakai isi tabel, tetapi tidak menambahkan
+    token baru agar tabel tidak bercampur hasil dua stemmer.
+    """
+
+    def __init__(self, path=LOOKUP_PATH, load=True):
+        self.path = path
+        self.roots = {}
+        self.unchanged = set()
+        self.stemmer = STEMMER_NAME
+        self._pending = []
+        self._lock = threading.Lock()
+        self._sastrawi = None
+        self._wordnet = None
+        self._deferred = queue.Queue()
+        self._queued = set()
+        self._worker = None
+        self._warned = False
+        self._merge_disk = load  # --rebuild: flush pertama menimpa tabel lama
+        if load and path and os.path.exists(path):
+            self.load(path)
+
+    @property
+    def writable(self):
+        return self.stemmer == STEMMER_NAME
+
+    def __len__(self):
+        return len(self.roots) + len(self.unchanged)
+
+    def __contains__(self, token):
+        return token in self.roots or token in self.unchanged
+
+    # ----- stemmer (dibuat hanya saat ada token baru) -----
+
+    def _wordnet_lemmatizer(self):
+        if self._wordnet is None:
+            with self._lock:
+                if self._wordnet is None:
+                    self._wordnet = WordNetLemmatizer()
+        return self._wordnet
+
+    def _sastrawi_stemmer(self):
+        # Dibuat di bawah lock; thread lain menunggu sampai stemmer siap dan
+        # tidak pernah men-stem tanpa Sastrawi di proses yang memilikinya
+        if self._sastrawi is None and StemmerFactory is not None:
+            with self._lock:
+                if self._sastrawi is None:
+                    self._sastrawi = StemmerFactory().create_stemmer()
+        return self._sastrawi
+
+    def _stem_uncached(self, token):
+        sastrawi = self._sastrawi_stemmer()
+        root = sastrawi.stem(token) if sastrawi is not None else token
+        if not root or root == token:
+            root = self._wordnet_lemmatizer().lemmatize(token)
+        return root or token
+
+    def _stem_fast(self, token):
+        """Hasil sementara untuk token baru: WordNet saja (mikrodetik per token)."""
+        return self._wordnet_lemmatizer().lemmatize(token) or token
+
+    def _add(self, token, root):
+        token = sys.intern(token)
+        if root == token:
+            self.unchanged.add(token)
+        else:
+            self.roots[token] = sys.intern(root)
+
+    def stem(self, token):
+        root = self.roots.get(token)
+        if root is not None:
+            return root
+        if token in self.unchanged:
+            return token
+
+        if not self.writable:
+            self._warn_read_only()
+            return self._stem_fast(token)
+        if StemmerFactory is None:
+            # Tanpa Sastrawi, stem penuh sama murahnya dengan hasil sementara
+            root = self._stem_uncached(token)
+            self._store(token, root)
+            return root
+        self._defer(token)
+        return self._stem_fast(token)
+
+    def _store(self, token, root):
+        if not self.writable:
+            return
+        with self._lock:
+            self._add(token, root)
+            self._pending.append((token, root))
+            should_flush = len(self._pending) >= FLUSH_EVERY
+        if should_flush:
+            self.flush()
+
+    def _defer(self, token):
+        with self._lock:
+            if token in self._queued:
+                return
+            self._queued.add(token)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._resolve_deferred,
+                                                name='stem-lookup', daemon=True)
+                self._worker.start()
+        self._deferred.put(token)
+
+    def _resolve_deferred(self):
+        while True:
+            token = self._deferred.get()
+            try:
+                self._store(token, self._stem_uncached(token))
+            finally:
+                with self._lock:
+                    self._queued.discard(token)
+
+    def build(self, tokens):
+        """Isi tabel untuk seluruh kosakata sekaligus (tiap token unik di-stem penuh sekali, sinkron)."""
+        new_tokens = {t for t in tokens if t and t not in self}
+        for token in sorted(new_tokens):
+            self._store(token, self._stem_uncached(token))
+        self.flush()
+        return len(new_tokens)
+
+    def _warn_read_only(self):
+        if not self._warned:
+            self._warned = True
+            warnings.warn(
+                f"Tabel stemming {self.path} dibuat dengan stemmer '{self.stemmer}', "
+                f"proses ini memakai '{STEMMER_NAME}'; token baru hanya di-lemmatize WordNet dan tidak disimpan. "
+                f"Bangun ulang dengan `python stemming.py --rebuild`."
+            )
+
+    # ----- penyimpanan -----
+
+    @staticmethod
+    def _read_file(path):
+        """Baca (stemmer, [(token, root)]); file tanpa header berasal dari stemmer yang tidak diketahui."""
+        stemmer, entries = None, []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if line.startswith(HEADER_PREFIX):
+                    stemmer = line[len(HEADER_PREFIX):]
+                    continue
+                token, _, root = line.partition('\t')
+                if token:
+                    entries.append((token, root or token))
+        return stemmer, entries
+
+    def load(self, path):
+        stemmer, entries = self._read_file(path)
+        self.stemmer = stemmer
+        for token, root in entries:
+            self._add(token, root)
+
+    def flush(self):
+        """
+        Tulis ulang seluruh tabel (isi file terbaru digabung dengan isi memori)
+        ke file sementara lalu ganti dengan `os.replace`. Jika dua proses flush
+        bersamaan, token yang hilang dari file tetap ada di memori dan ikut
+        tertulis pada flush berikutnya.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or not self.path:
+            return
+
+        entries = {}
+        if self._merge_disk and os.path.exists(self.path):
+            stemmer, on_disk = self._read_file(self.path)
+            if stemmer != self.stemmer:
+                return  # tabel di disk dibangun ulang oleh stemmer lain
+            entries.update(on_disk)
+        with self._lock:
+            entries.update((token, token) for token in self.unchanged)
+            entries.update(self.roots)
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                f.write(f"{HEADER_PREFIX}{self.stemmer}\n")
+                for token in sorted(entries):
+                    root = entries[token]
+                    f.write(f"{token}\t{root}\n" if root != token else f"{token}\n")
+            os.replace(tmp_path, self.path)
+            self._merge_disk = True
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+_lookup = None
+
+
+def get_stem_lookup(path=LOOKUP_PATH):
+    """Satu tabel per proses, dipakai bersama oleh app, trainer, dan streaming."""
+    global _lookup
+    if _lookup is None:
+        _lookup = StemLookup(path)
+        atexit.register(_lookup.flush)
+    return _lookup
+
+
+def main():
+    # Diimpor di sini karena preprocessing.py memakai modul ini
+    from preprocessing import clean_tokens, download_nltk_data
+
+    parser = argparse.ArgumentParser(description="Bangun tabel stemming token -> kata dasar.")
+    parser.add_argument('sources', nargs='*', default=['data/data_mentah.csv', 'data/data_dengan_sentimen.csv'])
+    parser.add_argument('--output', default=LOOKUP_PATH)
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Abaikan tabel lama dan stem ulang seluruh kosakata dengan stemmer proses ini")
+    args = parser.parse_args()
+
+    download_nltk_data()
+    lookup = StemLookup(args.output, load=not args.rebuild)
+    if not lookup.writable:
+        parser.error(f"{args.output} dibuat dengan stemmer '{lookup.stemmer}', proses ini memakai "
+                     f"'{STEMMER_NAME}'; gunakan --rebuild")
+    vocabulary = set()
+    for source in args.sources:
+        sep = ';' if source.endswith('data_mentah.csv') else ','
+        tweets = pd.read_csv(source, sep=sep, usecols=['tweet'], dtype=str, on_bad_lines='skip')['tweet']
+        for tweet in tweets.dropna():
+            vocabulary.update(clean_tokens(tweet))
+    added = lookup.build(vocabulary)
+    print(f"{len(vocabulary)} token unik, {added} token baru di-stem, "
+          f"{len(lookup.roots)} berubah / {len(lookup.unchanged)} tetap -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
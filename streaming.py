@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from dedup import ONLINE_MAX_ITEMS, THRESHOLD, LSHIndex
+from preprocessing import download_nltk_data, preprocess_text
+from registry import load_active_models
+
+# ========== Konfigurasi ==========
+
+WINDOW_STORE = 'data/stream_windows.csv'
+WINDOW_COLUMNS = ['window_start', 'window_end', 'Sentiment', 'Jumlah']
+TANGGAL_FORMAT = '%a %b %d %H:%M:%S %z %Y'  # format kolom `tanggal` di data mentah
+
+_STOP = object()
+
+
+# ========== Parsing Record ==========
+
+def parse_tanggal(value):
+    """Ubah `tanggal` (format Twitter atau ISO) ke epoch detik, None jika gagal."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    for parser in (lambda v: datetime.strptime(v, TANGGAL_FORMAT),
+                   datetime.fromisoformat):
+        try:
+            dt = parser(str(value).strip())
+        except ValueError:
+            continue
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return None
+
+
+def parse_line(line, fmt, header=None, delimiter=','):
+    """Ubah satu baris feed menjadi dict {'tweet', 'ts'}; None jika baris tidak valid."""
+    line = line.strip()
+    if not line:
+        return None
+    if fmt == 'jsonl':
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        tweet = obj.get('tweet') or obj.get('text')
+        tanggal = obj.get('tanggal')
+    elif fmt == 'csv':
+        values = next(csv.reader([line], delimiter=delimiter))
+        # Nama kolom bisa berulang (data_mentah.csv: id_user;tweet;tanggal;;;id_user;...);
+        # kolom pertama yang dipakai, salinan berikutnya yang sering kosong diabaikan
+        row = {}
+        for name, value in zip(header, values):
+            row.setdefault(name, value)
+        tweet = row.get('tweet')
+        tanggal = row.get('tanggal')
+    else:  # teks polos, satu tweet per baris
+        tweet, tanggal = line, None
+    if not tweet:
+        return None
+    return {'tweet': tweet, 'ts': parse_tanggal(tanggal) or time.time()}
+
+
+# ========== Sumber Data ==========
+
+async def tail_file(path, queue, fmt, poll_interval=0.5, from_start=True, follow=True):
+    """
+    Baca feed JSONL/CSV seperti `tail -f`.
+
+    `queue.put` akan menunggu saat antrean penuh, sehingga pembacaan file
+    berhenti sampai classifier mengejar (backpressure).
+    """
+    header, delimiter = None, ','
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        if fmt == 'csv':
+            first = f.readline()
+            delimiter = ';' if first.count(';') > first.count(',') else ','
+            header = next(csv.reader([first.strip()], delimiter=delimiter))
+        if not from_start:
+            f.seek(0, os.SEEK_END)
+
+        buffer = ''
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                if not follow:
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+            buffer += chunk
+            if not buffer.endswith('\n'):
+                continue  # baris belum selesai ditulis
+            record = parse_line(buffer, fmt, header, delimiter)
+            buffer = ''
+            if record is not None:
+                await queue.put(record)
+    await queue.put(_STOP)
+
+
+async def serve_socket(host, port, queue, fmt='jsonl'):
+    """
+    Pengganti lokal untuk sumber socket: setiap koneksi mengirim satu record per baris.
+
+    Saat antrean penuh, reader berhenti membaca sehingga TCP flow control
+    menahan pengirim.
+    """
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            record = parse_line(line.decode('utf-8', errors='replace'), fmt)
+            if record is not None:
+                await queue.put(record)
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+# ========== Agregasi Tumbling Window ==========
+
+class WindowAggregator:
+    """
+    Hitung jumlah sentimen per tumbling window berdasarkan waktu tweet.
+
+    Window ditutup ketika watermark (waktu terbesar dikurangi `lateness`)
+    melewati akhir window, lalu ditambahkan ke file CSV ringkas.
+    """
+
+    def __init__(self, window_seconds=60, store_path=WINDOW_STORE, lateness=0):
+        self.window_seconds = window_seconds
+        self.store_path = store_path
+        self.lateness = lateness
+        self.windows = {}
+        self.max_ts = None
+
+    def window_start(self, ts):
+        return int(ts // self.window_seconds) * self.window_seconds
+
+    def add(self, ts, label):
+        start = self.window_start(ts)
+        self.windows.setdefault(start, Counter())[label] += 1
+        self.max_ts = ts if self.max_ts is None else max(self.max_ts, ts)
+
+    def flush(self, force=False):
+        if self.max_ts is None:
+            return 0
+        watermark = self.max_ts - self.lateness
+        closed = sorted(
+            start for start in self.windows
+            if force or start + self.window_seconds <= watermark
+        )
+        rows = []
+        for start in closed:
+            for label, count in sorted(self.windows.pop(start).items()):
+                rows.append([start, start + self.window_seconds, label, count])
+        if rows:
+            write_header = not os.path.exists(self.store_path)
+            with open(self.store_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if write_header:
+                    writer.writerow(WINDOW_COLUMNS)
+                writer.writerows(rows)
+        return len(closed)
+
+
+def load_windows(path=WINDOW_STORE, last=None):
+    """Baca hasil window untuk dashboard; window yang ditulis ulang (data terlambat) dijumlahkan."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=WINDOW_COLUMNS)
+    df = pd.read_csv(path)
+    df = df.groupby(['window_start', 'window_end', 'Sentiment'], as_index=False)['Jumlah'].sum()
+    if last is not None:
+        keep = sorted(df['window_start'].unique())[-last:]
+        df = df[df['window_start'].isin(keep)]
+    df['waktu'] = pd.to_datetime(df['window_start'], unit='s', utc=True)
+    return df
+
+
+# ========== Klasifikasi Batch ==========
+
+def score_batch(model, le, preprocessed):
+    predictions = model.predict(preprocessed)
+    if le is not None:
+        predictions = le.inverse_transform(predictions)
+    return [str(p).capitalize() for p in predictions]
+
+
+def process_batch(model, le, tweets, dedup_index=None):
+    """
+    Preprocess sekali, buang near-duplicate (mis. retweet), lalu klasifikasi.
+    Mengembalikan (mask teks yang disimpan, label untuk teks yang disimpan).
+    """
+    preprocessed = [preprocess_text(t) for t in tweets]
+    if dedup_index is not None:
+        keep = dedup_index.filter_new(preprocessed).tolist()
+        preprocessed = [text for text, new in zip(preprocessed, keep) if new]
+    else:
+        keep = [True] * len(tweets)
+    labels = score_batch(model, le, preprocessed) if preprocessed else []
+    return keep, labels
+
+
+async def classify_stream(queue, model, le, aggregator, batch_size=256, max_wait=1.0,
+                          report_every=10.0, dedup_index=None):
+    loop = asyncio.get_running_loop()
+    processed, started, last_report = 0, time.perf_counter(), time.perf_counter()
+    skipped = 0
+    done = False
+
+    while not done:
+        item = await queue.get()
+        if item is _STOP:
+            break
+        batch = [item]
+        deadline = loop.time() + max_wait
+        while len(batch) < batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                done = True
+                break
+            batch.append(item)
+
+        # Preprocess, dedup, dan prediksi di thread terpisah agar event loop tetap
+        # menerima data; selama menunggu, antrean terisi dan sumber data ikut tertahan.
+        keep, labels = await loop.run_in_executor(
+            None, process_batch, model, le, [r['tweet'] for r in batch], dedup_index
+        )
+        batch = [record for record, new in zip(batch, keep) if new]
+        skipped += len(keep) - len(batch)
+        if batch:
+            for record, label in zip(batch, labels):
+                aggregator.add(record['ts'], label)
+            aggregator.flush()
+            processed += len(batch)
+
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            rate = processed / (now - started)
+            print(f"[stream] {processed} tweet, {rate:.1f} tweet/s, "
+                  f"{skipped} duplikat dilewati, antrean {queue.qsize()}")
+            last_report = now
+
+    aggregator.flush(force=True)
+    return processed
+
+
+async def run_pipeline(args):
+    # Artefak yang sama dengan dashboard: versi aktif di registry (atau model/ tanpa registry)
+    models, version = load_active_models()
+    model, le = models[args.model], models.get('label_encoder')
+    print(f"Model {args.model} dari versi {version or 'model/'}")
+    queue = asyncio.Queue(maxsize=args.queue_size)
+    aggregator = WindowAggregator(args.window, args.store, args.lateness)
+
+    if args.socket:
+        host, port = args.socket.rsplit(':', 1)
+        source = serve_socket(host, int(port), queue, args.format)
+    else:
+        source = tail_file(args.source, queue, args.format, args.poll_interval,
+                           from_start=not args.from_end, follow=not args.once)
+
+    source_task = asyncio.create_task(source)
+    try:
+        dedup_index = (LSHIndex(threshold=args.dedup_threshold, max_items=args.dedup_max_items)
+                       if args.dedup else None)
+        processed = await classify_stream(queue, model, le, aggregator,
+                                          args.batch_size, args.max_wait,
+                                          dedup_index=dedup_index)
+    finally:
+        source_task.cancel()
+        aggregator.flush(force=True)
+    print(f"Selesai: {processed} tweet diproses, hasil window di {args.store}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming analisis sentimen dengan tumbling window.")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument('--source', help="File feed JSONL/CSV/TXT yang akan di-tail")
+    src.add_argument('--socket', help="host:port untuk menerima record per baris")
+    parser.add_argument('--format', choices=['jsonl', 'csv', 'txt'], default='jsonl')
+    parser.add_argument('--model', choices=['nb', 'svm', 'xgb'], default='nb')
+    parser.add_argument('--window', type=int, default=60, help="Ukuran window (detik)")
+    parser.add_argument('--lateness', type=int, default=0, help="Toleransi data terlambat (detik)")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--max-wait', type=float, default=1.0, help="Waktu tunggu maksimum batch (detik)")
+    parser.add_argument('--queue-size', type=int, default=5000, help="Batas antrean (backpressure)")
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    parser.add_argument('--store', default=WINDOW_STORE)
+    parser.add_argument('--from-end', action='store_true', help="Mulai dari akhir file")
+    parser.add_argument('--once', action='store_true', help="Berhenti di akhir file")
+    parser.add_argument('--dedup', action='store_true', help="Lewati near-duplicate (MinHash LSH)")
+    parser.add_argument('--dedup-threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--dedup-max-items', type=int, default=ONLINE_MAX_ITEMS,
+                        help="Batas isi indeks dedup; indeks dikosongkan saat penuh")
+    args = parser.parse_args()
+    if args.socket and args.format == 'csv':
+        # Koneksi socket tidak membawa baris header, jadi kolom CSV tidak diketahui
+        parser.error("--format csv hanya didukung untuk --source; gunakan jsonl atau txt untuk --socket")
+
+    download_nltk_data()
+    try:
+        asyncio.run(run_pipeline(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
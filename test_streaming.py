@@ -0,0 +1,30 @@
+import asyncio
+import csv
+import os
+
+from streaming import _STOP, parse_line, tail_file
+
+DATA_MENTAH = os.path.join(os.path.dirname(__file__), 'data', 'data_mentah.csv')
+
+
+def test_parse_line_keeps_first_duplicate_column():
+    header = ['id_user', 'tweet', 'tanggal', '', '', 'id_user', 'tweet', 'tanggal']
+    record = parse_line('1;halo dunia;Thu Dec 05 13:39:41 +0000 2024;;;;;', 'csv', header, ';')
+    assert record['tweet'] == 'halo dunia'
+
+
+def test_tail_file_reads_every_row_of_data_mentah():
+    with open(DATA_MENTAH, 'r', encoding='utf-8', errors='replace') as f:
+        n_rows = sum(1 for row in csv.reader(f, delimiter=';') if row) - 1
+
+    async def collect():
+        queue = asyncio.Queue()
+        await tail_file(DATA_MENTAH, queue, 'csv', follow=False)
+        records = []
+        while (item := queue.get_nowait()) is not _STOP:
+            records.append(item)
+        return records
+
+    records = asyncio.run(collect())
+    assert len(records) == n_rows
+    assert all(record['tweet'] for record in records)
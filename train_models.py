@@ -1,15 +1,11 @@
 import os
-import pandas as pd
-import re
+import time
 import joblib
-import nltk
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import xgboost as xgb
 
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
@@ -19,34 +15,46 @@ from sklearn.preprocessing import LabelEncoder
 from imblearn.over_sampling import SMOTE
 from imblearn.pipeline import Pipeline as ImbPipeline
 
+from dataset import read_table
+from dedup import near_duplicate_mask
+from distill import distill_student
+from preprocessing import clean_tokens, download_nltk_data, preprocess_text
+from registry import MODEL_ARTIFACTS, register_version
+from stemming import get_stem_lookup
+
 # Download NLTK resources
-nltk.download('stopwords')
-nltk.download('wordnet')
+download_nltk_data()
 
 # Buat folder model jika belum ada
 os.makedirs('model', exist_ok=True)
 
 # Load dataset
 print("Loading dataset...")
-df = pd.read_csv('data/data_dengan_sentimen.csv')
+df = read_table('data_dengan_sentimen', columns=['tweet', 'Sentiment'])
 
 # Cek missing values
 if df.isnull().values.any():
     print("Warning: Missing values found. Dropping...")
     df.dropna(inplace=True)
 
-# Preprocessing
-stop_words = set(stopwords.words('indonesian') + stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
-
-def preprocess_text(text):
-    text = re.sub(r'http\S+|www\S+|https\S+', '', str(text))
-    text = re.sub(r'[^a-z\s]', '', text.lower())
-    words = [lemmatizer.lemmatize(word) for word in text.split() if word not in stop_words]
-    return ' '.join(words)
-
 print("Preprocessing data...")
+preprocess_start = time.perf_counter()
+# Stem seluruh kosakata korpus sekali (termasuk data_mentah yang dipakai tahap
+# distilasi); preprocess_text lalu cukup lookup per token
+stem_lookup = get_stem_lookup()
+raw_tweets = read_table('data_mentah', columns=['tweet'])['tweet'].dropna()
+n_new_tokens = stem_lookup.build(
+    token for tweets in (df['tweet'], raw_tweets) for tweet in tweets for token in clean_tokens(tweet)
+)
+print(f"Tabel stemming: {len(stem_lookup)} token ({n_new_tokens} baru)")
 df['clean_text'] = df['tweet'].apply(preprocess_text)
+preprocess_seconds = time.perf_counter() - preprocess_start
+
+# Hapus near-duplicate (retweet dengan mention/URL berbeda) agar tidak
+# menggelembungkan SMOTE dan waktu training
+n_before = len(df)
+df = df[near_duplicate_mask(df['clean_text'].tolist())]
+print(f"Near-duplicate dihapus: {n_before - len(df)} dari {n_before} baris")
 
 # Features & Labels
 X = df['clean_text']
@@ -68,6 +76,20 @@ X_train, X_test, y_train_encoded, y_test_encoded = train_test_split(
 # TF-IDF Vectorizer (akan dipakai di pipeline)
 tfidf_vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
 
+# Metrik & waktu per model, disimpan di manifest registry
+metrics = {}
+timing = {'preprocess_seconds': preprocess_seconds}
+
+def summarize_metrics(y_true, y_pred):
+    report = classification_report(y_true, y_pred, target_names=le.classes_,
+                                   output_dict=True, zero_division=0)
+    return {
+        'accuracy': report['accuracy'],
+        'precision': report['weighted avg']['precision'],
+        'recall': report['weighted avg']['recall'],
+        'f1': report['weighted avg']['f1-score'],
+    }
+
 def create_pipeline(model):
     """
     Create an imblearn pipeline:
@@ -84,9 +106,14 @@ def create_pipeline(model):
 # ========== NAIVE BAYES ==========
 print("\nTraining Naive Bayes...")
 nb_pipeline = create_pipeline(MultinomialNB())
+start = time.perf_counter()
 nb_pipeline.fit(X_train, y_train_encoded)
+timing['nb'] = {'fit_seconds': time.perf_counter() - start}
 
+start = time.perf_counter()
 y_pred_nb = nb_pipeline.predict(X_test)
+timing['nb']['predict_seconds'] = time.perf_counter() - start
+metrics['nb'] = summarize_metrics(y_test_encoded, y_pred_nb)
 
 print("\nNaive Bayes Classification Report:")
 print(classification_report(
@@ -109,9 +136,14 @@ plt.show()
 print("\nTraining SVM...")
 svm_model = SVC(random_state=42, probability=True)
 svm_pipeline = create_pipeline(svm_model)
+start = time.perf_counter()
 svm_pipeline.fit(X_train, y_train_encoded)
+timing['svm'] = {'fit_seconds': time.perf_counter() - start}
 
+start = time.perf_counter()
 y_pred_svm = svm_pipeline.predict(X_test)
+timing['svm']['predict_seconds'] = time.perf_counter() - start
+metrics['svm'] = summarize_metrics(y_test_encoded, y_pred_svm)
 
 print("\nSVM Classification Report:")
 print(classification_report(
@@ -138,9 +170,14 @@ xgb_model = xgb.XGBClassifier(
     use_label_encoder=False
 )
 xgb_pipeline = create_pipeline(xgb_model)
+start = time.perf_counter()
 xgb_pipeline.fit(X_train, y_train_encoded)
+timing['xgb'] = {'fit_seconds': time.perf_counter() - start}
 
+start = time.perf_counter()
 y_pred_xgb = xgb_pipeline.predict(X_test)
+timing['xgb']['predict_seconds'] = time.perf_counter() - start
+metrics['xgb'] = summarize_metrics(y_test_encoded, y_pred_xgb)
 
 print("\nXGBoost Classification Report:")
 print(classification_report(
@@ -171,5 +208,28 @@ joblib.dump(
     (X_test, y_test_encoded),
     'model/test_data.pkl'
 )
+# Teks latih ikut disimpan agar `python distill.py` melatih student pada data yang sama
+joblib.dump(list(X_train), 'model/train_texts.pkl')
+
+# ========== DISTILASI ==========
+# Satu student linear kecil yang meniru SVM + XGBoost
+print("\nDistilling student model...")
+start = time.perf_counter()
+student_pipeline, distill_report = distill_student(
+    {'nb': nb_pipeline, 'svm': svm_pipeline, 'xgb': xgb_pipeline},
+    X_train, X_test, y_test_encoded
+)
+timing['student'] = {'fit_seconds': time.perf_counter() - start}
+metrics['student'] = summarize_metrics(y_test_encoded, student_pipeline.predict(X_test))
+
+# ========== REGISTRASI VERSI ==========
+version = register_version(
+    {key: os.path.join('model', filename) for key, filename in MODEL_ARTIFACTS.items()}
+    | {'test_data': 'model/test_data.pkl', 'train_texts': 'model/train_texts.pkl'},
+    metrics=metrics,
+    timing=timing,
+    extra={'distillation': distill_report},
+)
+print(f"\nModel terdaftar sebagai versi {version} (model/registry/{version}).")
 
 print("\nTraining finished. Models saved successfully.")